@@ -112,6 +112,36 @@ class CommandError(commands.Cog):
         frozen = self.capture[idx]
         TracebackExceptionAnalyzer(self.bot, ctx.channel, frozen)
 
+    @commands.group(invoke_without_command=True)
+    async def providers(self, ctx):
+        """state of the circuit breaker and the latencies of every host the bot talked to"""
+        client = self.bot.http_client
+        lines = []
+
+        for host, stats in sorted(client.stats().items()):
+            breaker = stats["breaker"]
+            state = breaker["state"]
+            if breaker["reset_in"] > 0:
+                state += f" ({breaker['reset_in']:.0f}s)"
+
+            lines.append(f"{host}: {state}, {stats['requests']} requests, {stats['errors']} errors, "
+                         f"{stats['mean'] * 1000:.0f}ms mean, opened {breaker['times_opened']} times, "
+                         f"{breaker['rejected']} refused")
+
+        if client.cache is not None:
+            cache = client.cache.stats()
+            lines.append(f"cache: {cache['entries']} entries, {cache['size'] / (1 << 20):.1f}MiB, "
+                         f"{cache['hits']} hits, {cache['stale_hits']} stale, {cache['revalidated']} revalidated, "
+                         f"{cache['misses']} misses")
+
+        await ctx.send("```\n" + ("\n".join(lines) or "no requests yet") + "```")
+
+    @providers.command()
+    async def reset(self, ctx, host):
+        """closes the breaker of the host"""
+        self.bot.http_client.breaker(host).success()
+        await ctx.send(f"`{host}` is closed")
+
     def build_frozen(self, traceback_exception):
         captured_frames = []
 
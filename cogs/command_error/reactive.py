@@ -13,6 +13,8 @@ class TracebackExceptionAnalyzer(ReactiveMessage):
     CAUSE = "\U0001f1e6"
     CONTEXT = "\U0001f1e8"
 
+    IDLE_TIMEOUT = 15 * 60
+
     def __init__(self, bot, channel, frozen_exception: FrozenTracebackException):
         super().__init__(bot, channel)
         self.original = frozen_exception
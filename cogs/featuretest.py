@@ -16,11 +16,23 @@ class TestReactiveMessageBasis:
     FOUR = "\u0034\ufe0f\u20e3"
     FIVE = "\u0035\ufe0f\u20e3"
 
+    IDLE_TIMEOUT = 10 * 60
+    PERSISTENT = True
+
     def __init__(self):
         self.reactions = False
         self.show_embed = False
         self.change_content = False
 
+    def snapshot_state(self):
+        return dict(reactions=self.reactions, show_embed=self.show_embed, change_content=self.change_content)
+
+    async def restore_state(self, state):
+        self.reactions = state["reactions"]
+        self.show_embed = state["show_embed"]
+        self.change_content = state["change_content"]
+        return True
+
     def generate_embed(self):
         return discord.Embed(title="This command tests the reactive_message module and it's updatability",
                              description="This module is capable of constructing classes that can render "
@@ -127,6 +139,8 @@ class TestRouteReactiveMessage(RoutedReactiveMessage):
     THREE = "\u0033\ufe0f\u20e3"
     FOUR = "\u0034\ufe0f\u20e3"
     FIVE = "\u0035\ufe0f\u20e3"
+    IDLE_TIMEOUT = 10 * 60
+    PERSISTENT = True
     ROUTE = (Route()
              .add_route("a", APage)
              .add_route("b", Route()
@@ -155,6 +169,20 @@ class FeatureTester(commands.Cog):
     async def rmr(self, ctx):
         TestRouteReactiveMessage(self.bot, ctx.channel)
 
+    @commands.command(name="reactive-stats")
+    async def reactive_stats(self, ctx):
+        stats = self.bot.reactive_lifecycle.stats()
+
+        embed = discord.Embed(title="Live reactive messages", description=f"{stats['live']} live")
+
+        by_class = "\n".join(f"{name}: {count}" for name, count in stats["by_class"].items())
+        embed.add_field(name="By class", value=by_class or "<empty>", inline=False)
+        embed.add_field(name="Guilds", value=str(len(stats["by_guild"])))
+        embed.add_field(name="Longest idle", value=f"{round(stats['oldest_idle'])}s")
+        embed.add_field(name="Frozen", value=f"{stats['frozen_idle']} idle, {stats['frozen_capped']} capped")
+
+        await ctx.send(embed=embed)
+
 
 def setup(bot):
     bot.add_cog(FeatureTester(bot))
@@ -29,6 +29,9 @@ class MainPage(Page):
     PLAY_GAME = "\u25b6\ufe0f"
     SETTINGS_PAGE = "\u2699\ufe0f"
 
+    def state_version(self):
+        return tuple(member.id for member in self.message.queued_players)
+
     def render_message(self) -> Dict[str, Any]:
         embed = discord.Embed(title=f"{self.message.game_class.game_name} game",
                               color=0x333333)
@@ -85,7 +88,8 @@ async def request(bot, reactive_message, text, value_type, check):
     messages = [await reactive_message.channel.send(text)]
 
     try:
-        message = await bot.wait_for('message', check=check, timeout=30)
+        message = await bot.wait_for('message', check=check, timeout=30,
+                                     key=(reactive_message.channel.id, reactive_message.owner.id))
         messages.append(message)
         val = message.content
     except asyncio.TimeoutError:
@@ -98,6 +102,20 @@ async def request(bot, reactive_message, text, value_type, check):
         return convert(val, value_type)
 
 
+async def get_or_fetch_user(bot, channel, user_id):
+    guild = getattr(channel, "guild", None)
+
+    user = guild.get_member(user_id) if guild is not None else bot.get_user(user_id)
+    if user is None:
+        with suppress(discord.HTTPException):
+            if guild is not None:
+                user = await guild.fetch_member(user_id)
+            else:
+                user = await bot.fetch_user(user_id)
+
+    return user
+
+
 def _test(e):
     print(" ".join(hex(ord(letter)) for letter in e))
 
@@ -108,6 +126,8 @@ class PreparePage(Page):
     UNCONFIRMED = "\u274c"
     RESEND = "\U0001f501"
 
+    EVENTS = ("raw_reaction_add",)
+
     def __init__(self, message, args: Dict[str, str]):
         message: GameLobby
         super().__init__(message, args)
@@ -140,6 +160,11 @@ class PreparePage(Page):
                 await message.edit(content="Start was cancelled")
                 await message.delete(delay=30)
 
+    def state_version(self):
+        return (tuple(player.id for _, player in self.waiting_confirm),
+                tuple(player.id for player in self.waiting_resend),
+                tuple(member.id for member in self.message.queued_players))
+
     def render_message(self) -> Dict[str, Any]:
         embed = discord.Embed(title=f"{self.message.game_class.game_name} game",
                               color=0x333333)
@@ -202,6 +227,9 @@ class SettingsPage(Page):
     SAVE = "\U0001f4be"
     LOAD = "\U0001f4e5"
 
+    def state_version(self):
+        return tuple(self.message.game_settings.items())
+
     def render_message(self) -> Dict[str, Any]:
         embed = discord.Embed(title=f"{self.message.game_class.game_name} game",
                               color=0x333333)
@@ -243,10 +271,7 @@ class SettingsPage(Page):
         elif reaction.emoji == self.LOAD:
             bot = self.message.game_cog.bot
 
-            def check(m):
-                return m.channel == self.message.channel and m.author == self.message.owner
-
-            code = await request(bot, self.message, "Send code", str, check)
+            code = await request(bot, self.message, "Send code", str, None)
 
             content = base64.b85decode(code.encode()).decode()
 
@@ -266,8 +291,7 @@ class SettingsPage(Page):
                     except ValueError:
                         return False
                     else:
-                        return m.channel == self.message.channel and m.author == self.message.owner and \
-                               0 <= _idx < len(self.message.game_settings_proto)
+                        return 0 <= _idx < len(self.message.game_settings_proto)
 
                 idx = await request(bot, self.message, "Send the index of the setting you want to access", int, check)
 
@@ -275,11 +299,8 @@ class SettingsPage(Page):
                     picked_setting = [i for i in self.message.game_settings_proto.items()][idx]
                     picked_setting: Tuple[str, GameSetting]
 
-                    def check(m):
-                        return m.channel == self.message.channel and m.author == self.message.owner
-
                     val = await request(bot, self.message,
-                                        "Send the new value of this setting", picked_setting[1].setting_type, check)
+                                        "Send the new value of this setting", picked_setting[1].setting_type, None)
 
                     if val is not None:
                         self.message.game_settings[picked_setting[0]] = val
@@ -290,6 +311,9 @@ class SettingsPage(Page):
 
 
 class StartedPage(Page):
+    def state_version(self):
+        return ()
+
     def render_message(self) -> Dict[str, Any]:
         embed = discord.Embed(title="Game has begun", color=0x333333)
 
@@ -298,6 +322,11 @@ class StartedPage(Page):
 
 class GameLobby(RoutedReactiveMessage, HoistedReactiveMessage):
     ENFORCE_REACTION_POSITIONS = False
+    IDLE_TIMEOUT = 30 * 60
+
+    PERSISTENT = True
+    # the other pages depend on confirmation dms or a running game, which don't survive a restart
+    PERSISTENT_ROUTES = ("", "settings")
 
     ROUTE = (Route()
              .add_route("settings", SettingsPage)
@@ -316,6 +345,53 @@ class GameLobby(RoutedReactiveMessage, HoistedReactiveMessage):
         self.game_settings_proto = game_class.calculate_game_settings()
         self.game_settings = dict((key, val.default) for key, val in self.game_settings_proto.items())
 
+    def snapshot_state(self):
+        if self.route not in self.PERSISTENT_ROUTES or self.editing_setting:
+            return None
+
+        from cogs.gamecog.gamecog import games
+
+        state = super(GameLobby, self).snapshot_state()
+        state.update(game=next(name for name, game_class in games.items() if game_class is self.game_class),
+                     owner=self.owner.id,
+                     queued=[member.id for member in self.queued_players],
+                     settings=self.game_settings)
+
+        return state
+
+    async def restore_state(self, state):
+        from cogs.gamecog.gamecog import games
+
+        self.game_cog = self.bot.get_cog("GameCog")
+        self.game_class = games.get(state["game"])
+        self.owner = await get_or_fetch_user(self.bot, self.channel, state["owner"])
+
+        if self.game_cog is None or self.game_class is None or self.owner is None:
+            return False
+
+        self.queued_players = []
+        for user_id in state["queued"]:
+            # players could have joined something else since the restart
+            if user_id not in self.game_cog.user_state:
+                user = await get_or_fetch_user(self.bot, self.channel, user_id)
+                if user is not None:
+                    self.queued_players.append(user)
+
+        self.editing_setting = False
+        self.editing_which = None
+        self.game_settings_proto = self.game_class.calculate_game_settings()
+        self.game_settings = dict((key, state["settings"].get(key, val.default))
+                                  for key, val in self.game_settings_proto.items())
+
+        if not await super(GameLobby, self).restore_state(state):
+            return False
+
+        for queued in self.queued_players:
+            self.game_cog.user_state[queued.id] = self._current_page
+        self.game_cog.lobbies.append(self)
+
+        return True
+
     async def remove(self):
         for queued in self.queued_players:
             with suppress(KeyError):
@@ -1,26 +1,127 @@
-from typing import List
+from collections import OrderedDict
+from contextlib import suppress
+from typing import List, Dict, Tuple
 
 import discord
 from discord import RawReactionActionEvent, Reaction
 from discord.ext import commands
 
 from cogs.gamecog.GameLobby import GameLobby
+from games.CheckpointLog import CheckpointLog
 from games.Game import Game
 from games.GamePlayer import GamePlayer
+from games.TimeoutScheduler import TimeoutScheduler
 from games.game_modules.blackjack import blackjack
 from games.game_modules.trivia import trivia
+from games.game_modules.trivia.questions import QuestionBank
 from games.game_modules.uno import uno
 
 games = {"uno": uno.UnoGame, "trivia": trivia.TriviaGame, "blackjack": blackjack.BlackJackGame}
 
 
 class GameCog(commands.Cog):
+    MAX_TRACKED_MESSAGES = 500
+
     def __init__(self, bot: commands.Bot):
         self.bot = bot
         self.user_state = {}
         self.game_instances: List[Game] = []
         self.lobbies: List[GameLobby] = []
 
+        # round timeouts of every running game share this scheduler
+        self.timeouts = TimeoutScheduler(bot.loop)
+
+        # (dm channel id, user id) -> player, the player holds its game instance
+        self.players_by_channel: Dict[Tuple[int, int], GamePlayer] = {}
+
+        # messages sent to players, so reactions can be rebuilt without scanning the message cache
+        self.game_messages: OrderedDict[int, discord.Message] = OrderedDict()
+
+        # running games are checkpointed after each call_wrap, the ones found here are resumed once ready
+        self.checkpoints = CheckpointLog(bot.loop, "game_checkpoints.log")
+        self._to_resume = self.checkpoints.load()
+
+        # trivia questions seen so far, so trivia still works when the api doesn't
+        self.question_bank = QuestionBank("trivia_questions.jsonl")
+        self.question_bank.load()
+
+        if bot.is_ready():
+            # reloaded, the games of the previous instance of the cog are resumed by this one
+            bot.loop.create_task(self.on_ready())
+
+    def cog_unload(self):
+        # the final snapshots are recorded before the games stop, stopped games never record their end
+        for instance in self.game_instances:
+            instance.stop()
+
+        self.checkpoints.close()
+
+    @commands.Cog.listener()
+    async def on_ready(self):
+        to_resume = self._to_resume
+        self._to_resume = []
+
+        for game_id, state in to_resume:
+            await self.resume_game(game_id, state)
+
+    async def resume_game(self, game_id, state):
+        game_class = games.get(state["game"])
+        channel = self.bot.get_channel(state["channel"])
+
+        if game_class is None or channel is None:
+            self.checkpoints.record(game_id, None)
+            return
+
+        players = []
+
+        for player_state in state["players"]:
+            user = self.bot.get_user(player_state["user"])
+            if user is None:
+                with suppress(discord.HTTPException):
+                    user = await self.bot.fetch_user(player_state["user"])
+
+            if user is None or user.id in self.user_state:
+                continue
+
+            try:
+                bound_channel = await user.create_dm()
+            except discord.HTTPException:
+                continue
+
+            player = game_class.game_player_class(user, bound_channel)
+            player.restore_state(player_state)
+            players.append(player)
+
+        if not game_class.is_playable(len(players)):
+            self.checkpoints.record(game_id, None)
+            return
+
+        instance = game_class(self, channel, players, state["settings"])
+        instance.checkpoint_id = game_id
+
+        for player in players:
+            player.game_instance = instance
+            self.user_state[player.id] = instance
+            self.index_player(player)
+
+        instance.restore_state(state)
+
+        self.game_instances.append(instance)
+
+        await instance.call_wrap(instance.on_resume())
+
+    def index_player(self, player: GamePlayer):
+        self.players_by_channel[(player.bound_channel.id, player.id)] = player
+
+    def unindex_player(self, player: GamePlayer):
+        self.players_by_channel.pop((player.bound_channel.id, player.id), None)
+
+    def track_message(self, message: discord.Message):
+        self.game_messages[message.id] = message
+
+        if len(self.game_messages) > self.MAX_TRACKED_MESSAGES:
+            self.game_messages.popitem(last=False)
+
     @commands.group()
     async def game(self, ctx):
         """Group command for games"""
@@ -94,6 +195,7 @@ class GameCog(commands.Cog):
 
         for player in players:
             self.user_state[player.id] = instance
+            self.index_player(player)
 
         # adds the game to the queue
 
@@ -103,44 +205,49 @@ class GameCog(commands.Cog):
 
     @commands.Cog.listener()
     async def on_message(self, message):
+        if message.guild is not None:
+            # games only happen in dms
+            return
+
         if message.content.startswith(f"{self.bot.command_prefix}l"):
             return
-        for instance in self.game_instances:
-            for player in instance.players:
-                player: GamePlayer
 
-                # check if the message is pertinent for this instance
-                if message.channel.id == player.bound_channel.id and \
-                        message.author.id == player.id:
-                    await instance.call_wrap(instance.on_message(message, player))
-                    return
+        player = self.players_by_channel.get((message.channel.id, message.author.id))
+
+        if player is not None:
+            instance = player.game_instance
+            await instance.call_wrap(instance.on_message(message, player),
+                                     collapse_key=instance.message_collapse_key(message, player),
+                                     droppable=True)
 
     @commands.Cog.listener()
     async def on_raw_reaction_add(self, ev: RawReactionActionEvent):
-        if ev.user_id == self.bot.user.id:
+        if ev.guild_id is not None or ev.user_id == self.bot.user.id:
             return
 
-        for instance in self.game_instances:
-            for player in instance.players:
-                player: GamePlayer
-
-                # check if the reaction is pertinent for this instance
-                if ev.channel_id == player.bound_channel.id and ev.user_id == player.id:
-                    data = dict(message_id=ev.user_id, channel_id=ev.channel_id,
-                                user_id=ev.user_id, guild_id=ev.guild_id)
-
-                    message = discord.utils.find(lambda m: m.id == ev.message_id, reversed(self.bot.cached_messages))
-
-                    emoji_id = ev.emoji.id
-                    if not emoji_id:
-                        emoji = ev.emoji.name
-                    else:
-                        try:
-                            emoji = self.bot.get_emoji(emoji_id)
-                        except KeyError:
-                            emoji = ev.emoji
-
-                    await instance.call_wrap(instance.on_reaction_add(Reaction(message=message,
-                                                                               data=data,
-                                                                               emoji=emoji), player))
-                    return
+        player = self.players_by_channel.get((ev.channel_id, ev.user_id))
+
+        if player is None:
+            return
+
+        data = dict(message_id=ev.user_id, channel_id=ev.channel_id,
+                    user_id=ev.user_id, guild_id=ev.guild_id)
+
+        message = self.game_messages.get(ev.message_id)
+        if message is None:
+            message = player.bound_channel.get_partial_message(ev.message_id)
+
+        emoji_id = ev.emoji.id
+        if not emoji_id:
+            emoji = ev.emoji.name
+        else:
+            try:
+                emoji = self.bot.get_emoji(emoji_id)
+            except KeyError:
+                emoji = ev.emoji
+
+        instance = player.game_instance
+        await instance.call_wrap(instance.on_reaction_add(Reaction(message=message,
+                                                                   data=data,
+                                                                   emoji=emoji), player),
+                                 droppable=True)
@@ -7,21 +7,20 @@ from concurrent.futures import ThreadPoolExecutor
 from functools import partial, wraps
 from io import BytesIO
 
-import aiohttp
 import discord
 import imagehash
 from PIL import Image, ImageStat
 from PIL.ImageDraw import ImageDraw
 from discord.ext import commands
 
+from util.http_client import client
 from .bot_avatar import get_new_avatar
 from .flag_retriever.flag import Flag
 from .resize import center_resize
 
 
 async def retrieve(url):
-    async with aiohttp.request("GET", url) as image_response:
-        return await image_response.read()
+    return (await client.get(url)).body
 
 
 def image_as_io(func):
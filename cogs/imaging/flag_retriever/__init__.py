@@ -1,8 +1,11 @@
+import asyncio
 import functools
 import typing
 
+import aiohttp
 from async_lru import alru_cache
 
+from util.circuit_breaker import CircuitOpen
 from .abc import FlagRetriever
 from .flag import Flag
 
@@ -18,9 +21,26 @@ def get_retrievers() -> typing.List[FlagRetriever]:
 
 @alru_cache
 async def get_flag(name, schema=None) -> typing.Optional[Flag]:
+    """
+    the first retriever that has the flag wins, the ones that are failing are skipped
+    raises the last error instead of returning None if one was skipped or failed, so the miss isn't cached
+    """
+    error = None
+
     for retriever in get_retrievers():
         if schema is None or retriever.schema == schema:
-            ret = await retriever.get_flag(name)
+            if not retriever.available:
+                error = CircuitOpen(f"{retriever} is unavailable")
+                continue
+
+            try:
+                ret = await retriever.get_flag(name)
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                error = e
+                continue
 
             if ret is not None:
                 return ret
+
+    if error is not None:
+        raise error
@@ -2,9 +2,18 @@ import abc
 import typing
 
 from cogs.imaging.flag_retriever.flag import Flag
+from util.http_client import client
 
 
 class FlagRetriever(abc.ABC):
+    # hosts the retriever depends on
+    hosts = ()
+
+    @property
+    def available(self):
+        """false while one of its hosts is failing, the retriever is skipped then"""
+        return all(client.available(host) for host in self.hosts)
+
     @abc.abstractmethod
     def __str__(self):
         pass
@@ -1,13 +1,14 @@
 import difflib
 import typing
 
-import aiohttp
-
+from util.http_client import client
 from . import Flag
 from .abc import FlagRetriever
 
 
 class CountryFlagRetriever(FlagRetriever):
+    hosts = ("flagcdn.com",)
+
     @property
     def schema(self):
         return "country"
@@ -18,9 +19,8 @@ class CountryFlagRetriever(FlagRetriever):
 
     async def get_codes(self) -> dict:
         if self._codes is None:
-            async with aiohttp.request("GET", f"https://flagcdn.com/en/codes.json") as code_response:
-                self._codes = await code_response.json()
-                self._codes = {k.lower(): v for k, v in self._codes.items()}
+            codes = (await client.get("https://flagcdn.com/en/codes.json")).json()
+            self._codes = {k.lower(): v for k, v in codes.items()}
 
         return self._codes
 
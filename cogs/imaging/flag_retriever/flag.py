@@ -11,6 +11,8 @@ from discord.ext import commands
 from reportlab.graphics import renderPM
 from svglib.svglib import svg2rlg
 
+from util.http_client import client
+
 
 class Flag:
     def __init__(self, url, name, provider, *, is_remote=False):
@@ -21,11 +23,9 @@ class Flag:
 
     async def read(self):
         if self.is_remote:
-            obj = aiohttp.request("GET", self.url)
-        else:
-            obj = aiofiles.open(self.url, "rb")
+            return (await client.get(self.url)).body
 
-        async with obj as reader:
+        async with aiofiles.open(self.url, "rb") as reader:
             return await reader.read()
 
     async def open(self):
@@ -48,11 +48,14 @@ class Flag:
     async def convert(cls, ctx, argument) -> Flag:
         from cogs.imaging.flag_retriever import get_flag
 
-        if ":" in argument:
-            chunks = argument.split(":")
-            ret = await get_flag(chunks[1], chunks[0])
-        else:
-            ret = await get_flag(argument)
+        try:
+            if ":" in argument:
+                chunks = argument.split(":")
+                ret = await get_flag(chunks[1], chunks[0])
+            else:
+                ret = await get_flag(argument)
+        except (aiohttp.ClientError, asyncio.TimeoutError):
+            raise commands.BadArgument(f"Flag `{argument}` not found, some flag providers can't be reached right now.")
 
         if ret is None:
             raise commands.BadArgument(f"Flag `{argument}` not found.")
@@ -0,0 +1,150 @@
+import asyncio
+import marshal
+import os
+import struct
+import threading
+from typing import Dict, List, Optional, Tuple
+
+HEADER = struct.Struct("<I")
+
+
+def _frame(payload: bytes) -> bytes:
+    return HEADER.pack(len(payload)) + payload
+
+
+class CheckpointLog:
+    """
+    append only log of the states of the running games, so they can be resumed after a restart or a crash
+    each record is a length prefixed marshal dump of (game id, state), a None state marks a game that ended
+    records are merged per game and written in batches from an executor, so turns never wait on the disk
+    """
+
+    # seconds records are gathered before being written
+    FLUSH_DELAY = 0.5
+
+    # the log is rewritten with only the latest records once it grows past this many bytes
+    COMPACT_SIZE = 1 << 20
+
+    def __init__(self, loop, path):
+        self.loop = loop
+        self.path = path
+
+        self._latest: Dict[str, bytes] = {}  # latest record of every running game
+        self._pending: Dict[str, bytes] = {}  # records waiting to be written
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        self._writing: Optional[asyncio.Future] = None
+        self._size = 0
+
+        # the executor writes and close's rewrite never touch the file at the same time
+        self._file_lock = threading.Lock()
+        self._closed = False
+
+    def load(self) -> List[Tuple[str, dict]]:
+        """reads the log, returns the (game id, state) of the games that were running"""
+        try:
+            with open(self.path, "rb") as f:
+                data = f.read()
+        except FileNotFoundError:
+            return []
+
+        offset = 0
+        while offset + HEADER.size <= len(data):
+            length, = HEADER.unpack_from(data, offset)
+            start = offset + HEADER.size
+            end = start + length
+
+            if end > len(data):
+                # the last write was cut short
+                break
+
+            try:
+                game_id, state = marshal.loads(data[start:end])
+            except (EOFError, ValueError, TypeError):
+                break
+
+            if state is None:
+                self._latest.pop(game_id, None)
+            else:
+                self._latest[game_id] = data[start:end]
+
+            offset = end
+
+        self._size = self._rewrite(list(self._latest.values()))
+
+        return [marshal.loads(payload) for payload in self._latest.values()]
+
+    def record(self, game_id: str, state: Optional[dict]):
+        payload = marshal.dumps((game_id, state))
+
+        if state is None:
+            self._latest.pop(game_id, None)
+        else:
+            self._latest[game_id] = payload
+
+        self._pending[game_id] = payload
+
+        if self._flush_handle is None and self._writing is None:
+            self._flush_handle = self.loop.call_later(self.FLUSH_DELAY, self._start_flush)
+
+    def _start_flush(self):
+        self._flush_handle = None
+        self._writing = asyncio.ensure_future(self._flush())
+
+    async def _flush(self):
+        try:
+            while len(self._pending) > 0:
+                batch = list(self._pending.values())
+                self._pending.clear()
+
+                if self._size > self.COMPACT_SIZE:
+                    # the latest records already include the batch
+                    self._size = await self.loop.run_in_executor(None, self._rewrite, list(self._latest.values()))
+                else:
+                    self._size += await self.loop.run_in_executor(None, self._append, batch)
+        finally:
+            self._writing = None
+
+    def _append(self, payloads: List[bytes]) -> int:
+        data = b"".join(_frame(payload) for payload in payloads)
+
+        with self._file_lock:
+            if self._closed:
+                # close already wrote these records, or newer ones
+                return 0
+
+            with open(self.path, "ab") as f:
+                f.write(data)
+
+        return len(data)
+
+    def _rewrite(self, payloads: List[bytes], closing=False) -> int:
+        data = b"".join(_frame(payload) for payload in payloads)
+
+        temporary = f"{self.path}.tmp"
+        with self._file_lock:
+            if self._closed:
+                # a compaction queued before close, its records are older than the ones close wrote
+                return 0
+
+            with open(temporary, "wb") as f:
+                f.write(data)
+            os.replace(temporary, self.path)
+
+            self._closed = closing
+
+        return len(data)
+
+    def close(self):
+        """
+        writes everything right away, pending batches included
+        a write already running in the executor is waited for (through the file lock), the queued ones are skipped
+        """
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+
+        self._pending.clear()
+        self._size = self._rewrite(list(self._latest.values()), closing=True)
+
+    def __len__(self):
+        return len(self._latest)
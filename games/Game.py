@@ -1,8 +1,9 @@
 import abc
 import asyncio
+import logging
+import uuid
 from contextlib import suppress
 from enum import Enum
-from functools import partial
 from typing import Dict, Union
 
 import discord
@@ -10,7 +11,10 @@ from discord import TextChannel
 
 from games.GamePlayer import GamePlayer
 from games.GameSetting import GameSetting
-from games.MulticastIntent import AbstractMulticastIntent
+from games.Mailbox import Mailbox
+from games.MulticastIntent import AbstractMulticastIntent, ArbitraryMulticastIntent
+
+logger = logging.getLogger(__name__)
 
 
 class EndGame(Enum):
@@ -35,14 +39,34 @@ class Game(abc.ABC):
     game_specific_settings: Dict[str, GameSetting] = {}
     game_player_class = GamePlayer
 
+    # events waiting to be handled, and how many are handled between two flushes of the sends
+    MAILBOX_SIZE = 64
+    MAX_BATCH = 16
+
     def __init__(self, cog, channel: TextChannel, players, settings):
         self.channel = channel
         self.running = True
         self.cog = cog
         self.players = PlayerList(players)
-        self.lock = asyncio.Lock()
         self.settings = settings
 
+        # every event goes through the mailbox, the actor runs them one at a time
+        self.mailbox = Mailbox(asyncio.get_event_loop(), self.MAILBOX_SIZE)
+        self._actor = None
+
+        # while true, player sends are queued and merged until the end of the batch
+        self.batching_sends = False
+        self._players_to_flush = {}
+
+        self.checkpoint_id = uuid.uuid4().hex
+        self.stopped = False  # stopped by a shutdown rather than ended, its checkpoint is kept
+
+        # how the game ended, the EndGame code and its arguments
+        self.end_code = None
+        self.end_args = ()
+        # calls made by after, as (method name, when, coroutine)
+        self._scheduled: Dict[asyncio.TimerHandle, tuple] = {}
+
     @classmethod
     def calculate_game_settings(cls):
         ret = {}
@@ -54,6 +78,9 @@ class Game(abc.ABC):
         return ret
 
     async def end_game(self, code: EndGame, *args):
+        self.end_code = code
+        self.end_args = args
+
         if code == EndGame.DRAW:
             embed = discord.Embed(title="Game",
                                   description=f"Draw",
@@ -79,8 +106,10 @@ class Game(abc.ABC):
         await self.players.including(self.channel).send(embed=embed)
         self.cog.game_instances.remove(self)
         self.running = False
+        self._cancel_scheduled()
         for player in self.players:
             del self.cog.user_state[player.id]
+            self.cog.unindex_player(player)
         raise GameEndedException
 
     async def on_start(self):
@@ -117,6 +146,7 @@ class Game(abc.ABC):
 
         self.players.remove(player)
         del self.cog.user_state[player.id]
+        self.cog.unindex_player(player)
 
         if not self.is_still_playable():
             await self.end_game(EndGame.INSUFFICIENT_PLAYERS)
@@ -130,32 +160,166 @@ class Game(abc.ABC):
             if player.id == id_:
                 return player
 
+    def queue_flush(self, player):
+        self._players_to_flush[player] = None
+
+    async def flush_sends(self):
+        players = list(self._players_to_flush)
+        self._players_to_flush.clear()
+
+        if len(players) > 0:
+            await ArbitraryMulticastIntent(players).flush()
+
     def after(self, seconds, callback):
+        """callback is a call to a method of the game without arguments, so it can be checkpointed"""
         loop = asyncio.get_running_loop()
-        return loop.call_later(seconds, partial(asyncio.ensure_future, self.call_wrap(callback), loop=loop))
 
-    async def call_wrap(self, coroutine):
-        async with self.lock:
-            if self.running:
+        def fire():
+            self._scheduled.pop(handle, None)
+            asyncio.ensure_future(self.call_wrap(callback), loop=loop)
+
+        handle = loop.call_later(seconds, fire)
+        self._scheduled[handle] = (callback.__name__, loop.time() + seconds, callback)
+        return handle
+
+    def _cancel_scheduled(self):
+        for handle, (_, _, callback) in self._scheduled.items():
+            handle.cancel()
+            callback.close()
+        self._scheduled.clear()
+
+    def snapshot_state(self) -> dict:
+        """the state of the game as plain data (see CheckpointLog), extended by the subclasses"""
+        now = asyncio.get_running_loop().time()
+
+        return dict(game=self.game_name,
+                    channel=self.channel.id,
+                    settings=self.settings,
+                    players=[player.snapshot_state() for player in self.players],
+                    scheduled=[(name, max(when - now, 0)) for name, when, _ in self._scheduled.values()])
+
+    def restore_state(self, state: dict):
+        """restores what snapshot_state returned, players are already restored"""
+        for name, delay in state["scheduled"]:
+            self.after(delay, getattr(self, name)())
+
+    async def on_resume(self):
+        """called through call_wrap after the game was restored from a checkpoint"""
+        embed = discord.Embed(title="Game",
+                              description="The game was resumed after a restart",
+                              color=0x333333)
+
+        await self.players.send(embed=embed)
+
+    def checkpoint(self):
+        if self.cog.checkpoints is None or self.stopped:
+            return
+
+        self.cog.checkpoints.record(self.checkpoint_id, self.snapshot_state() if self.running else None)
+
+    def message_collapse_key(self, message, player):
+        """
+        queued messages of the player with the same key replace each other, only the latest one is handled
+        None, the default, never collapses
+        """
+        return None
+
+    async def call_wrap(self, coroutine, collapse_key=None, droppable=False):
+        """
+        hands the coroutine to the game's actor and waits until it ran
+        when the mailbox is full droppable events (player input) are dropped, the others wait for space
+        """
+        while self.running and self.mailbox.full:
+            if droppable:
+                logger.debug("mailbox full, dropping %s", coroutine)
+                self.mailbox.reject(coroutine)
+                return
+
+            await self.mailbox.wait_space()
+
+        if not self.running:
+            coroutine.close()
+            return
+
+        future = self.mailbox.put(coroutine, collapse_key)
+
+        if self._actor is None:
+            self._actor = asyncio.ensure_future(self._run_actor())
+
+        return await future
+
+    async def _run_actor(self):
+        try:
+            while self.running and len(self.mailbox) > 0:
+                await self._run_batch(self.mailbox.take(self.MAX_BATCH))
+        finally:
+            self._actor = None
+
+            if not self.running:
+                self.mailbox.clear()
+
+    async def _run_batch(self, envelopes):
+        self.batching_sends = True
+        try:
+            for envelope in envelopes:
+                if not self.running:
+                    envelope.drop()
+                    continue
+
+                logger.debug("entering %s", envelope.coroutine)
                 try:
-                    print(f"entering {coroutine}")
+                    result = None
                     with suppress(GameEndedException):
-                        await coroutine
-
-                    to_leave = []
+                        result = await envelope.coroutine
+                    envelope.set_result(result)
+                except Exception as e:
+                    with suppress(GameEndedException):
+                        await self.end_game(EndGame.ERROR, e)
+                    envelope.set_exception(e)
+                logger.debug("exiting %s", envelope.coroutine)
 
-                    for player in self.players:
-                        if not player.able_to_send_messages:
-                            to_leave.append(player)
+            if self.running:
+                await self.flush_sends()
 
-                    for player in to_leave:
-                        await self.player_leave(player, LeaveReason.CHANNEL_BLOCKED)
+                # once per batch instead of once per event
+                to_leave = [player for player in self.players if not player.able_to_send_messages]
 
-                    print(f"exiting {coroutine}")
+                try:
+                    with suppress(GameEndedException):
+                        for player in to_leave:
+                            await self.player_leave(player, LeaveReason.CHANNEL_BLOCKED)
                 except Exception as e:
                     with suppress(GameEndedException):
                         await self.end_game(EndGame.ERROR, e)
                     raise
+        finally:
+            await self.flush_sends()
+            self.batching_sends = False
+
+            try:
+                self.checkpoint()
+            except Exception:
+                # the previous checkpoint stays, the actor goes on
+                logger.exception("couldn't checkpoint %s", self.checkpoint_id)
+
+    def stop(self):
+        """
+        stops the game without ending it, for shutdowns, so it's resumed from its checkpoint afterwards
+        a game in the middle of a batch keeps the checkpoint of the previous one, it's the last consistent state
+        """
+        if not self.running:
+            return
+
+        if self._actor is None:
+            try:
+                self.checkpoint()
+            except Exception:
+                logger.exception("couldn't checkpoint %s", self.checkpoint_id)
+
+        self.stopped = True
+        self.running = False
+
+        self._cancel_scheduled()
 
 
 class GameEndedException(Exception):
@@ -1,6 +1,5 @@
 import asyncio
 from abc import ABC, abstractmethod
-from functools import partial
 
 from games.Game import Game
 from games.GameSetting import GameSetting
@@ -11,24 +10,44 @@ class GameWithTimeout(Game, ABC):
 
     def __init__(self, cog, channel, players, settings):
         super().__init__(cog, channel, players, settings)
-        self.round_timeout = None
+        self.round_timer = cog.timeouts.timer(self.on_round_timer)
 
-    async def decrement(self):
-        while self.running:
-            await asyncio.sleep(1)
-            self.round_timeout -= 1
-
-            if self.round_timeout == 0:
-                await self.call_wrap(self.timeout())
+    def on_round_timer(self):
+        if self.running:
+            asyncio.ensure_future(self.call_wrap(self.timeout()))
 
     async def on_start(self):
         self.reset_timer()
-        loop = asyncio.get_running_loop()
-        loop.call_soon(partial(asyncio.ensure_future, self.decrement(), loop=loop))
+
+    async def end_game(self, code, *args):
+        self.round_timer.cancel()
+        await super(GameWithTimeout, self).end_game(code, *args)
 
     @abstractmethod
     async def timeout(self):
         raise NotImplementedError
 
     def reset_timer(self):
-        self.round_timeout = self.settings["timeout"]
+        self.round_timer.arm(self.settings["timeout"])
+
+    def extend_timer(self, seconds):
+        self.round_timer.extend(seconds)
+
+    def stop_timer(self):
+        self.round_timer.cancel()
+
+    def snapshot_state(self):
+        state = super(GameWithTimeout, self).snapshot_state()
+        state["timer"] = self.remaining_time
+        return state
+
+    def restore_state(self, state):
+        super(GameWithTimeout, self).restore_state(state)
+        # the time the bot was down isn't counted
+        if state["timer"] is not None:
+            self.round_timer.arm(state["timer"])
+
+    @property
+    def remaining_time(self):
+        """seconds until the round times out, None if the timer is stopped"""
+        return self.round_timer.remaining
@@ -1,28 +1,132 @@
+from typing import List, Optional
+
 from discord.abc import Messageable
 
+MESSAGE_LIMIT = 2000
+
 
 class Absorber:
     async def add_reaction(self, *_, **__):
         pass
 
 
+class PendingMessage:
+    def __init__(self):
+        self.lines: List[str] = []
+        self.embed = None
+
+    def size_with(self, content):
+        return sum(len(line) + 1 for line in self.lines) + len(content)
+
+    def accepts(self, content: Optional[str], embed):
+        # text can't go after an embed, it would be rendered above it
+        if self.embed is not None:
+            return False
+
+        return content is None or self.size_with(content) <= MESSAGE_LIMIT
+
+    def add(self, content: Optional[str], embed):
+        if content is not None:
+            self.lines.append(content)
+        if embed is not None:
+            self.embed = embed
+
+    def as_kwargs(self):
+        content = "\n".join(self.lines) if len(self.lines) > 0 else None
+        return dict(content=content, embed=self.embed)
+
+
+class Outbox:
+    """merges the plain text/embed sends of a player until it's flushed"""
+
+    def __init__(self):
+        self.pending: List[PendingMessage] = []
+        self.queued = 0
+        self.sent = 0
+
+    def add(self, content, embed):
+        if content is not None:
+            content = str(content)
+
+        if len(self.pending) == 0 or not self.pending[-1].accepts(content, embed):
+            self.pending.append(PendingMessage())
+
+        self.pending[-1].add(content, embed)
+        self.queued += 1
+
+    def take(self) -> List[PendingMessage]:
+        ret = self.pending
+        self.pending = []
+        self.sent += len(ret)
+        return ret
+
+    @property
+    def saved(self):
+        """how many api calls the merging avoided"""
+        return self.queued - self.sent - len(self.pending)
+
+    def __len__(self):
+        return len(self.pending)
+
+
 class GamePlayer(Messageable):
     async def _get_channel(self):
         return self.bound_channel
 
-    async def send(self, *args, **kwargs):
+    async def send(self, content=None, *, embed=None, **kwargs):
+        if len(kwargs) > 0 or self.game_instance is None or not self.game_instance.batching_sends:
+            return await self.send_now(content, embed=embed, **kwargs)
+
+        if content is None and embed is None:
+            return
+
+        self.outbox.add(content, embed)
+        self.game_instance.queue_flush(self)
+
+    async def send_now(self, *args, **kwargs):
+        """sends skipping the outbox (after what is queued), use it when the message itself is needed"""
+        await self.flush()
+
         if self.able_to_send_messages:
             try:
-                return await super(GamePlayer, self).send(*args, **kwargs)
+                message = await self.transmit(*args, **kwargs)
             except:
                 self.able_to_send_messages = False
                 return Absorber()
+            else:
+                if self.game_instance is not None:
+                    self.game_instance.cog.track_message(message)
+                return message
+
+    async def transmit(self, *args, **kwargs):
+        """actually sends a message to the bound channel, every send ends up here"""
+        return await super(GamePlayer, self).send(*args, **kwargs)
+
+    async def flush(self):
+        for pending in self.outbox.take():
+            if not self.able_to_send_messages:
+                return
+
+            try:
+                message = await self.transmit(**pending.as_kwargs())
+            except:
+                self.able_to_send_messages = False
+            else:
+                if self.game_instance is not None:
+                    self.game_instance.cog.track_message(message)
 
     def __init__(self, user, bound_channel):
         self.bound_channel = bound_channel
         self.user = user
         self.able_to_send_messages = True
         self.game_instance = None  # it is provided later
+        self.outbox = Outbox()
+
+    def snapshot_state(self) -> dict:
+        return dict(user=self.user.id, able_to_send_messages=self.able_to_send_messages)
+
+    def restore_state(self, state: dict):
+        self.able_to_send_messages = state["able_to_send_messages"]
 
     def __getattr__(self, item):
         return getattr(self.user, item)
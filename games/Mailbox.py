@@ -0,0 +1,124 @@
+import asyncio
+import itertools
+from collections import OrderedDict
+from typing import List
+
+
+class Envelope:
+    """a coroutine waiting in a mailbox and the future of its result"""
+
+    __slots__ = ("coroutine", "future")
+
+    def __init__(self, coroutine, future: asyncio.Future):
+        self.coroutine = coroutine
+        self.future = future
+
+    def set_result(self, result):
+        if not self.future.done():
+            self.future.set_result(result)
+
+    def set_exception(self, exception):
+        if not self.future.done():
+            self.future.set_exception(exception)
+
+    def drop(self):
+        """the coroutine will never run, whoever waits on it gets None"""
+        self.coroutine.close()
+        self.set_result(None)
+
+
+class Mailbox:
+    """
+    bounded queue of the events of a game, drained in batches by the game's actor
+    an event posted with the collapse key of one still waiting replaces it, so only the latest one runs
+    """
+
+    def __init__(self, loop, size: int):
+        self.loop = loop
+        self.size = size
+
+        self._envelopes: OrderedDict = OrderedDict()  # collapse key, or a unique one, -> envelope
+        self._unique = itertools.count()
+        self._space = asyncio.Event()
+        self._space.set()
+
+        self.posted = 0
+        self.processed = 0
+        self.collapsed = 0
+        self.dropped = 0
+        self.batches = 0
+        self.max_depth = 0
+
+    @property
+    def full(self):
+        return len(self._envelopes) >= self.size
+
+    async def wait_space(self):
+        await self._space.wait()
+
+    def put(self, coroutine, collapse_key=None) -> asyncio.Future:
+        """queues the coroutine, the future resolves to its result once it ran"""
+        envelope = Envelope(coroutine, self.loop.create_future())
+        self.posted += 1
+
+        if collapse_key is None:
+            collapse_key = next(self._unique)
+        else:
+            # the unique keys are ints, collapse keys live in their own space
+            collapse_key = ("collapse", collapse_key)
+
+            # the replacement goes to the tail, it mustn't overtake what was posted after the one it replaces
+            previous = self._envelopes.pop(collapse_key, None)
+            if previous is not None:
+                previous.drop()
+                self.collapsed += 1
+
+        self._envelopes[collapse_key] = envelope
+        self.max_depth = max(self.max_depth, len(self._envelopes))
+
+        if self.full:
+            self._space.clear()
+
+        return envelope.future
+
+    def reject(self, coroutine):
+        """an event that didn't fit"""
+        coroutine.close()
+        self.posted += 1
+        self.dropped += 1
+
+    def take(self, quantity: int) -> List[Envelope]:
+        ret = []
+
+        while len(ret) < quantity and len(self._envelopes) > 0:
+            ret.append(self._envelopes.popitem(last=False)[1])
+
+        if len(ret) > 0:
+            self.batches += 1
+            self.processed += len(ret)
+
+        if not self.full:
+            self._space.set()
+
+        return ret
+
+    def clear(self):
+        """drops everything still waiting, the ones waiting for space are released too"""
+        for envelope in self._envelopes.values():
+            envelope.drop()
+            self.dropped += 1
+
+        self._envelopes.clear()
+        self._space.set()
+
+    def stats(self):
+        return dict(depth=len(self._envelopes),
+                    max_depth=self.max_depth,
+                    posted=self.posted,
+                    processed=self.processed,
+                    collapsed=self.collapsed,
+                    dropped=self.dropped,
+                    batches=self.batches)
+
+    def __len__(self):
+        return len(self._envelopes)
@@ -1,11 +1,63 @@
+from __future__ import annotations
+
 import abc
 import asyncio
-from typing import TypeVar, Iterable
+import time
+from dataclasses import dataclass, field
+from typing import TypeVar, Iterable, List, Any, Optional, Dict
+
+from util.eager_gather import eager_gather
 
 T = TypeVar('T')
 
 
+@dataclass
+class TargetOutcome:
+    target: Any
+    result: Any = None
+    exception: Optional[BaseException] = None
+    elapsed: float = 0
+
+
+@dataclass
+class MulticastResult:
+    outcomes: List[TargetOutcome] = field(default_factory=list)
+    elapsed: float = 0
+
+    @property
+    def results(self):
+        return [outcome.result for outcome in self.outcomes if outcome.exception is None]
+
+    @property
+    def exceptions(self):
+        return [outcome.exception for outcome in self.outcomes if outcome.exception is not None]
+
+    @property
+    def slowest(self) -> Optional[TargetOutcome]:
+        if len(self.outcomes) == 0:
+            return None
+        return max(self.outcomes, key=lambda outcome: outcome.elapsed)
+
+
+def _ordering_key(target):
+    # targets that write to the same channel must keep their order
+    return id(getattr(target, "bound_channel", target))
+
+
+async def _run_in_order(outcomes: List[TargetOutcome], coroutines, semaphore):
+    async with semaphore:
+        for outcome, coroutine in zip(outcomes, coroutines):
+            start = time.perf_counter()
+            try:
+                outcome.result = await coroutine
+            except Exception as e:
+                outcome.exception = e
+            outcome.elapsed = time.perf_counter() - start
+
+
 class AbstractMulticastIntent(abc.ABC):
+    MAX_CONCURRENCY = 5
+
     def to(self, targets: Iterable[T]):
         return ArbitraryMulticastIntent(targets)
 
@@ -22,15 +74,36 @@ class AbstractMulticastIntent(abc.ABC):
             getattr(t, item)
 
         def _(*args, **kwargs):
-            coroutines = []
+            result = MulticastResult()
+            groups: Dict[int, tuple] = {}
+
             for target in targets:
                 ret = getattr(target, item)(*args, **kwargs)
+                outcome = TargetOutcome(target)
+                result.outcomes.append(outcome)
+
                 if asyncio.iscoroutine(ret):
-                    coroutines.append(ret)
+                    group = groups.setdefault(_ordering_key(target), ([], []))
+                    group[0].append(outcome)
+                    group[1].append(ret)
+                else:
+                    outcome.result = ret
 
             async def _():
-                for r in coroutines:
-                    await r
+                start = time.perf_counter()
+                semaphore = asyncio.Semaphore(self.MAX_CONCURRENCY)
+
+                await eager_gather(*(_run_in_order(outcomes, coroutines, semaphore)
+                                     for outcomes, coroutines in groups.values()))
+
+                result.elapsed = time.perf_counter() - start
+
+                exceptions = result.exceptions
+                if len(exceptions) > 0:
+                    # every target got its turn, the first failure is still reported to the caller
+                    raise exceptions[0]
+
+                return result
 
             return _()
 
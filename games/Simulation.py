@@ -0,0 +1,500 @@
+"""
+headless game simulations, bot players with a virtual clock and a null transport, discord is never touched
+
+    python -m games.Simulation uno --games 10000 --players 4 --workers 8
+"""
+import argparse
+import asyncio
+import cProfile
+import io
+import itertools
+import math
+import pstats
+import random
+import selectors
+import sys
+import time
+import traceback
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Optional, List, Dict, Type
+
+from games.Game import Game, EndGame
+from games.TimeoutScheduler import TimeoutScheduler
+from games.game_modules.blackjack.blackjack import BlackJackGame, calculate_score
+from games.game_modules.trivia.questions import QuestionBank, QuestionFeed
+from games.game_modules.trivia.trivia import TriviaGame
+from games.game_modules.uno.registry import emoji_to_color
+from games.game_modules.uno.uno import UnoGame, State
+
+
+class _VirtualSelector(selectors.DefaultSelector):
+    def __init__(self, loop):
+        super().__init__()
+        self.virtual_loop = loop
+
+    def select(self, timeout=None):
+        events = super().select(0)
+
+        if len(events) == 0 and timeout is not None and timeout > 0:
+            # nothing can happen until the next timer, so the clock jumps right to it
+            self.virtual_loop.advance(timeout)
+
+        return events
+
+
+class VirtualClockLoop(asyncio.SelectorEventLoop):
+    """an event loop whose time only moves when everything is waiting on a timer"""
+
+    def __init__(self):
+        self._virtual_time = 0.0
+        self.unhandled_errors: List[str] = []
+        super().__init__(selector=_VirtualSelector(self))
+
+    def time(self):
+        return self._virtual_time
+
+    def advance(self, seconds):
+        self._virtual_time += seconds
+
+
+class NullTransport:
+    """counts the sends instead of doing them"""
+
+    def __init__(self):
+        self.sends = 0
+        self._ids = itertools.count(1)
+
+    def send(self, channel, content, embed):
+        self.sends += 1
+        return NullMessage(next(self._ids), channel, content, embed)
+
+
+class NullMessage:
+    def __init__(self, message_id, channel, content=None, embed=None):
+        self.id = message_id
+        self.channel = channel
+        self.content = content
+        self.embed = embed
+
+    async def add_reaction(self, emoji):
+        pass
+
+    async def edit(self, **kwargs):
+        pass
+
+    async def delete(self, **kwargs):
+        pass
+
+
+class NullChannel:
+    """stands for both the game channel and the dm channels of the players"""
+
+    def __init__(self, channel_id, transport: NullTransport):
+        self.id = channel_id
+        self.transport = transport
+
+    async def send(self, content=None, *, embed=None, **kwargs):
+        return self.transport.send(self, content, embed)
+
+
+@dataclass(eq=False)
+class SimulatedUser:
+    id: int
+
+    @property
+    def name(self):
+        return f"bot{self.id}"
+
+    @property
+    def display_name(self):
+        return self.name
+
+    @property
+    def mention(self):
+        return f"<@{self.id}>"
+
+
+@dataclass
+class SimulatedMessage:
+    content: str
+    author: SimulatedUser
+
+
+@dataclass
+class SimulatedReaction:
+    message: NullMessage
+    emoji: str
+
+
+class SimulatedPlayer:
+    """mixed before the game player class, sends go to the null channel"""
+
+    async def transmit(self, *args, **kwargs):
+        return await self.bound_channel.send(*args, **kwargs)
+
+
+_player_classes: Dict[type, type] = {}
+
+
+def simulated_player_class(game_class: Type[Game]):
+    base = game_class.game_player_class
+
+    if base not in _player_classes:
+        _player_classes[base] = type(f"Simulated{base.__name__}", (SimulatedPlayer, base), {})
+
+    return _player_classes[base]
+
+
+class SimulationCog:
+    """what the games need from GameCog"""
+
+    def __init__(self, loop):
+        self.bot = None
+        self.user_state = {}
+        self.game_instances = []
+        self.timeouts = TimeoutScheduler(loop)
+        self.checkpoints = None  # nothing to resume, so the states aren't even built
+        self.question_bank = QuestionBank(None)
+        self.question_bank.add(generated_questions(200))
+
+    def track_message(self, message):
+        pass
+
+    def unindex_player(self, player):
+        pass
+
+
+def generated_questions(count):
+    difficulties = ("easy", "medium", "hard")
+    ret = []
+
+    for idx in range(count):
+        difficulty = random.choice(difficulties)
+
+        if random.random() < 0.3:
+            correct = random.choice(("True", "False"))
+            ret.append(dict(type="boolean", difficulty=difficulty, category="Simulation",
+                            question=f"Is this simulated? ({idx})", correct_answer=correct,
+                            incorrect_answers=["False" if correct == "True" else "True"]))
+        else:
+            ret.append(dict(type="multiple", difficulty=difficulty, category="Simulation",
+                            question=f"Which one? ({idx})", correct_answer="a",
+                            incorrect_answers=["b", "c", "d"]))
+
+    return ret
+
+
+class OfflineQuestionFeed(QuestionFeed):
+    """never calls the api, the bank has everything"""
+
+    def prefetch(self):
+        pass
+
+
+class SimulatedTriviaGame(TriviaGame):
+    """trivia with generated questions instead of the api"""
+
+    def __init__(self, cog, channel, players, settings):
+        super().__init__(cog, channel, players, settings)
+        self.questions = OfflineQuestionFeed(cog.question_bank)
+
+
+class Policy:
+    """what a bot player does, act is asked every THINK_TIME seconds for each player"""
+
+    THINK_TIME = 1.0
+
+    # chance of doing nothing when it's the player's turn, so the timeouts are exercised too
+    IDLE_CHANCE = 0.02
+
+    def __init__(self, rng: random.Random):
+        self.rng = rng
+
+    def act(self, game, player):
+        """a coroutine for call_wrap, or None to do nothing"""
+        if self.rng.random() < self.IDLE_CHANCE:
+            return None
+
+        return self.decide(game, player)
+
+    def decide(self, game, player):
+        raise NotImplementedError
+
+
+class UnoPolicy(Policy):
+    SKIP_CHANCE = 0.05
+
+    def decide(self, game: UnoGame, player):
+        if len(game.players) == 0 or game.current_player is not player:
+            return None
+
+        if game.state == State.CARD_PICK:
+            playable = [idx for idx, card in enumerate(player.hand) if game.can_play(card)]
+
+            if len(playable) == 0 or self.rng.random() < self.SKIP_CHANCE:
+                content = "skip"
+            else:
+                content = str(self.rng.choice(playable))
+
+            return game.on_message(SimulatedMessage(content, player.user), player)
+
+        if game.state == State.FILL_ATTRIBUTES and game.bound_message is not None:
+            reaction = SimulatedReaction(game.bound_message, self.rng.choice(tuple(emoji_to_color)))
+            return game.on_reaction_add(reaction, player)
+
+
+class BlackJackPolicy(Policy):
+    def decide(self, game: BlackJackGame, player):
+        if game.hitting_player is not player:
+            return None
+
+        content = "hit" if calculate_score(player.hand) < self.rng.randint(14, 18) else "stay"
+        return game.on_message(SimulatedMessage(content, player.user), player)
+
+
+class TriviaPolicy(Policy):
+    ANSWER_CHANCE = 0.3
+
+    def decide(self, game: TriviaGame, player):
+        if game.trivia_question is None or player.response is not None or self.rng.random() > self.ANSWER_CHANCE:
+            return None
+
+        if game.trivia_question["type"] == "boolean":
+            content = self.rng.choice(("yes", "no"))
+        else:
+            content = str(self.rng.randrange(len(game.answers)))
+
+        return game.on_message(SimulatedMessage(content, player.user), player)
+
+
+GAMES = {
+    "uno": (UnoGame, UnoPolicy),
+    "blackjack": (BlackJackGame, BlackJackPolicy),
+    "trivia": (SimulatedTriviaGame, TriviaPolicy),
+}
+
+
+@dataclass
+class GameReport:
+    seed: int
+    end: Optional[str]  # None if it ran out of time
+    winner: Optional[int] = None  # seat
+    actions: int = 0
+    sends: int = 0
+    virtual_time: float = 0
+    wall_time: float = 0
+    error: Optional[str] = None
+    loop_errors: List[str] = field(default_factory=list)  # exceptions nothing awaited, timers and tasks
+
+
+async def run_game(name, player_count, seed, max_time, settings=None) -> GameReport:
+    game_class, policy_class = GAMES[name]
+
+    # the games use the random module directly
+    random.seed(seed)
+    policy = policy_class(random.Random(seed))
+
+    loop = asyncio.get_running_loop()
+    transport = NullTransport()
+    cog = SimulationCog(loop)
+
+    game_settings = {key: val.default for key, val in game_class.calculate_game_settings().items()}
+    game_settings.update(settings or {})
+
+    player_class = simulated_player_class(game_class)
+    players = [player_class(SimulatedUser(seat), NullChannel(seat, transport)) for seat in range(player_count)]
+    game = game_class(cog, NullChannel(-1, transport), players, game_settings)
+
+    for player in players:
+        player.game_instance = game
+        cog.user_state[player.id] = game
+    cog.game_instances.append(game)
+
+    report = GameReport(seed=seed, end=None)
+    start, virtual_start = time.perf_counter(), loop.time()
+
+    try:
+        await game.call_wrap(game.on_start())
+
+        while game.running and loop.time() - virtual_start < max_time:
+            await asyncio.sleep(policy.THINK_TIME)
+
+            for player in tuple(game.players):
+                if not game.running:
+                    break
+
+                action = policy.act(game, player)
+                if action is not None:
+                    report.actions += 1
+                    await game.call_wrap(action)
+    except Exception:
+        report.error = traceback.format_exc()
+    finally:
+        if game.running:
+            game.running = False
+            if hasattr(game, "round_timer"):
+                game.round_timer.cancel()
+
+    if game.end_code is not None:
+        report.end = game.end_code.name
+        if game.end_code == EndGame.WIN:
+            report.winner = game.end_args[0].id
+        elif game.end_code == EndGame.ERROR and report.error is None:
+            report.error = repr(game.end_args[0])
+
+    # the games run one after another, so what the loop caught meanwhile is this one's
+    report.loop_errors = loop.unhandled_errors
+    loop.unhandled_errors = []
+    if report.error is None and len(report.loop_errors) > 0:
+        report.error = report.loop_errors[0]
+
+    report.sends = transport.sends
+    report.virtual_time = loop.time() - virtual_start
+    report.wall_time = time.perf_counter() - start
+
+    return report
+
+
+@dataclass
+class Summary:
+    games: int = 0
+    ends: Counter = field(default_factory=Counter)
+    wins_by_seat: Counter = field(default_factory=Counter)
+    actions: int = 0
+    sends: int = 0
+    virtual_time: float = 0
+    wall_time: float = 0
+    slowest: List[GameReport] = field(default_factory=list)
+    errors: List[GameReport] = field(default_factory=list)
+    failed: int = 0
+    loop_errors: int = 0
+
+    KEEP = 5
+
+    def add(self, report: GameReport):
+        self.games += 1
+        self.ends[report.end] += 1
+        if report.winner is not None:
+            self.wins_by_seat[report.winner] += 1
+
+        self.actions += report.actions
+        self.sends += report.sends
+        self.virtual_time += report.virtual_time
+        self.wall_time += report.wall_time
+
+        self.slowest = sorted((*self.slowest, report), key=lambda r: r.wall_time, reverse=True)[:self.KEEP]
+        self.loop_errors += len(report.loop_errors)
+        if report.error is not None:
+            self.failed += 1
+            if len(self.errors) < self.KEEP:
+                self.errors.append(report)
+
+    def merge(self, other: "Summary"):
+        self.games += other.games
+        self.ends.update(other.ends)
+        self.wins_by_seat.update(other.wins_by_seat)
+        self.actions += other.actions
+        self.sends += other.sends
+        self.virtual_time += other.virtual_time
+        self.wall_time += other.wall_time
+        self.slowest = sorted((*self.slowest, *other.slowest), key=lambda r: r.wall_time, reverse=True)[:self.KEEP]
+        self.errors = (self.errors + other.errors)[:self.KEEP]
+        self.failed += other.failed
+        self.loop_errors += other.loop_errors
+
+
+def _record_exception(loop, context):
+    # nothing awaited it, run_game puts it in the report of the game that's running
+    exception = context.get("exception")
+
+    if exception is not None:
+        text = "".join(traceback.format_exception(type(exception), exception, exception.__traceback__))
+    else:
+        text = context["message"]
+
+    loop.unhandled_errors.append(text)
+
+
+def run_batch(name, player_count, seeds, max_time, settings=None) -> Summary:
+    loop = VirtualClockLoop()
+    loop.set_exception_handler(_record_exception)
+    summary = Summary()
+
+    try:
+        for seed in seeds:
+            summary.add(loop.run_until_complete(run_game(name, player_count, seed, max_time, settings)))
+    finally:
+        loop.close()
+
+    return summary
+
+
+def simulate(name, games, player_count, workers=None, seed=0, max_time=6 * 60 * 60, settings=None) -> Summary:
+    """runs the games across a process pool, each worker runs its batches one game after another"""
+    seeds = range(seed, seed + games)
+    batch_size = max(math.ceil(games / ((workers or 1) * 4)), 1)
+    batches = [seeds[idx:idx + batch_size] for idx in range(0, games, batch_size)]
+
+    summary = Summary()
+
+    with ProcessPoolExecutor(workers) as executor:
+        futures = [executor.submit(run_batch, name, player_count, batch, max_time, settings) for batch in batches]
+
+        for future in futures:
+            summary.merge(future.result())
+
+    return summary
+
+
+def profile(name, games, player_count, seed=0, max_time=6 * 60 * 60, settings=None, top=30) -> str:
+    """runs the games in this process under cProfile, returns the most expensive calls"""
+    profiler = cProfile.Profile()
+    profiler.enable()
+    run_batch(name, player_count, range(seed, seed + games), max_time, settings)
+    profiler.disable()
+
+    out = io.StringIO()
+    pstats.Stats(profiler, stream=out).sort_stats("cumulative").print_stats(top)
+    return out.getvalue()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("game", choices=sorted(GAMES))
+    parser.add_argument("--games", type=int, default=1000)
+    parser.add_argument("--players", type=int, default=4)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--max-time", type=float, default=6 * 60 * 60, help="virtual seconds before giving up a game")
+    parser.add_argument("--profile", action="store_true", help="run in this process under cProfile")
+    args = parser.parse_args()
+
+    if args.profile:
+        print(profile(args.game, args.games, args.players, args.seed, args.max_time))
+        return
+
+    start = time.perf_counter()
+    summary = simulate(args.game, args.games, args.players, args.workers, args.seed, args.max_time)
+    elapsed = time.perf_counter() - start
+
+    print(f"{summary.games} {args.game} games in {elapsed:.2f}s ({summary.games / elapsed:.0f} games/s)")
+    print(f"ends: {dict(summary.ends)}")
+    print(f"wins by seat: {dict(sorted(summary.wins_by_seat.items()))}")
+    print(f"per game: {summary.actions / summary.games:.1f} actions, {summary.sends / summary.games:.1f} sends, "
+          f"{summary.virtual_time / summary.games:.0f} virtual seconds, "
+          f"{summary.wall_time / summary.games * 1000:.2f} ms")
+    print("slowest seeds: " + ", ".join(f"{r.seed} ({r.wall_time * 1000:.1f} ms)" for r in summary.slowest))
+
+    print(f"failed: {summary.failed} games, {summary.loop_errors} exceptions nothing awaited")
+
+    for report in summary.errors:
+        print(f"\nseed {report.seed} failed:\n{report.error}")
+
+    if summary.failed > 0:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
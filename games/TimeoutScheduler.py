@@ -0,0 +1,118 @@
+import asyncio
+import heapq
+import itertools
+from typing import Optional, Callable, List, Tuple
+
+
+class Timer:
+    """a deadline owned by a scheduler; fires its callback once each time it is armed"""
+
+    def __init__(self, scheduler, callback: Callable[[], None]):
+        self.scheduler = scheduler
+        self.callback = callback
+        self.deadline: Optional[float] = None
+        self._version = 0
+
+    def arm(self, seconds):
+        self._set_deadline(self.scheduler.time() + seconds)
+
+    def extend(self, seconds):
+        # extending a timer that isn't running keeps it stopped
+        if self.deadline is not None:
+            self._set_deadline(self.deadline + seconds)
+
+    def cancel(self):
+        self.deadline = None
+        self._version += 1
+
+    @property
+    def armed(self):
+        return self.deadline is not None
+
+    @property
+    def remaining(self) -> Optional[float]:
+        if self.deadline is None:
+            return None
+        return max(self.deadline - self.scheduler.time(), 0)
+
+    def _set_deadline(self, deadline):
+        self.deadline = deadline
+        self._version += 1
+        self.scheduler.push(self)
+
+
+class TimeoutScheduler:
+    """
+    a single heap of deadlines shared by all the games
+    only the earliest deadline is registered in the event loop, so idle timers don't wake anything up
+    """
+
+    def __init__(self, loop=None):
+        self.loop = loop
+        self._heap: List[Tuple[float, int, int, Timer]] = []
+        self._counter = itertools.count()
+        self._handle: Optional[asyncio.TimerHandle] = None
+        self._handle_when: Optional[float] = None
+
+    def _get_loop(self):
+        if self.loop is None:
+            self.loop = asyncio.get_event_loop()
+        return self.loop
+
+    def time(self):
+        return self._get_loop().time()
+
+    def timer(self, callback: Callable[[], None]) -> Timer:
+        return Timer(self, callback)
+
+    def push(self, timer: Timer):
+        heapq.heappush(self._heap, (timer.deadline, next(self._counter), timer._version, timer))
+        self._reschedule()
+
+    def _reschedule(self):
+        self._drop_stale()
+
+        if len(self._heap) == 0:
+            if self._handle is not None:
+                self._handle.cancel()
+                self._handle = None
+                self._handle_when = None
+            return
+
+        when = self._heap[0][0]
+
+        if self._handle is not None:
+            if self._handle_when <= when:
+                # the pending wakeup is early enough, it will reschedule itself
+                return
+            self._handle.cancel()
+
+        self._handle = self._get_loop().call_at(when, self.run_due)
+        self._handle_when = when
+
+    def _drop_stale(self):
+        # entries are invalidated lazily, whenever the timer is re-armed or cancelled
+        while len(self._heap) > 0 and self._heap[0][2] != self._heap[0][3]._version:
+            heapq.heappop(self._heap)
+
+    def run_due(self, now=None):
+        self._handle = None
+        self._handle_when = None
+
+        if now is None:
+            now = self.time()
+
+        while len(self._heap) > 0 and self._heap[0][0] <= now:
+            _, _, version, timer = heapq.heappop(self._heap)
+
+            if version != timer._version:
+                continue
+
+            timer.deadline = None
+            timer._version += 1
+            timer.callback()
+
+        self._reschedule()
+
+    def __len__(self):
+        return sum(1 for _, _, version, timer in self._heap if version == timer._version)
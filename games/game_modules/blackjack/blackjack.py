@@ -6,7 +6,7 @@ from games.Game import EndGame, LeaveReason
 from games.GameHasTimeout import GameWithTimeout
 from games.GamePlayer import GamePlayer
 from games.GameSetting import GameSetting
-from games.game_modules.blackjack.cards import generate_deck, CardNumber
+from games.game_modules.blackjack.cards import generate_deck, CardNumber, encode_card, decode_card
 
 
 class BlackJackGamePlayer(GamePlayer):
@@ -15,6 +15,16 @@ class BlackJackGamePlayer(GamePlayer):
         self.hand = []
         self.points = 0
 
+    def snapshot_state(self):
+        state = super(BlackJackGamePlayer, self).snapshot_state()
+        state.update(hand=[encode_card(card) for card in self.hand], points=self.points)
+        return state
+
+    def restore_state(self, state):
+        super(BlackJackGamePlayer, self).restore_state(state)
+        self.hand = [decode_card(card) for card in state["hand"]]
+        self.points = state["points"]
+
 
 BlackJackPair = namedtuple("BlackJackPair", "hand score owner")
 
@@ -66,6 +76,37 @@ class BlackJackGame(GameWithTimeout):
         await super(BlackJackGame, self).on_start()
         await self.round_start()
 
+    def snapshot_state(self):
+        state = super(BlackJackGame, self).snapshot_state()
+
+        def encode(deck):
+            return [encode_card(card) for card in deck] if deck is not None else None
+
+        state.update(global_deck=encode(self.global_deck),
+                     dealer_deck=encode(self.dealer_deck),
+                     hitting=[player.id for player in self.hitting],
+                     hitting_player=self.hitting_player.id if self.hitting_player is not None else None)
+        return state
+
+    def restore_state(self, state):
+        super(BlackJackGame, self).restore_state(state)
+
+        def decode(deck):
+            return [decode_card(card) for card in deck] if deck is not None else None
+
+        self.global_deck = decode(state["global_deck"])
+        self.dealer_deck = decode(state["dealer_deck"])
+        self.hitting = [player for player in self.players if player.id in state["hitting"]]
+
+        ids = [player.id for player in self.hitting]
+        self.hitting_player_idx = ids.index(state["hitting_player"]) if state["hitting_player"] in ids else 0
+
+    async def on_resume(self):
+        await super(BlackJackGame, self).on_resume()
+
+        if self.hitting_player is not None and len(self._scheduled) == 0:
+            await self.decision_start()
+
     async def on_message(self, message, player):
         if self.hitting_player is None:
             return
@@ -218,7 +259,7 @@ class BlackJackGame(GameWithTimeout):
                             inline=False)
 
         await self.players.send(embed=embed)
-        self.round_timeout = -1
+        self.stop_timer()
 
         if game_winner is not None:
             await self.end_game(EndGame.WIN, game_winner)
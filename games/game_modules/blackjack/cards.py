@@ -39,6 +39,14 @@ class Card(namedtuple("CardTuple", "number type")):
         return f"{number} {type_}"
 
 
+def encode_card(card: Card):
+    return card.number.value, card.type.value
+
+
+def decode_card(data) -> Card:
+    return Card(CardNumber(data[0]), CardType(data[1]))
+
+
 def generate_deck():
     ret = [Card(CardNumber(val[0]), CardType(val[1])) for val in itertools.product(range(1, 14), range(4))]
     random.shuffle(ret)
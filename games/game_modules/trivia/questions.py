@@ -0,0 +1,221 @@
+import asyncio
+import base64
+import hashlib
+import json
+import logging
+import random
+from collections import defaultdict, deque
+from typing import Dict, List, Optional, Set, Tuple
+
+import aiohttp
+
+from util.http_client import client
+
+logger = logging.getLogger(__name__)
+
+API = "https://opentdb.com"
+
+# response codes of the api
+TOKEN_NOT_FOUND = 3
+TOKEN_EMPTY = 4
+
+
+def _decode(value: str) -> str:
+    return base64.b64decode(value).decode()
+
+
+def decode_question(raw: dict) -> dict:
+    """decodes a question the api sent with encode=base64"""
+    question = {key: _decode(value) for key, value in raw.items() if isinstance(value, str)}
+    question["incorrect_answers"] = [_decode(answer) for answer in raw["incorrect_answers"]]
+    return question
+
+
+def question_id(question: dict) -> str:
+    return hashlib.sha1(f"{question['question']}\0{question['correct_answer']}".encode()).hexdigest()[:16]
+
+
+async def _get_json(url):
+    return (await client.get(url)).json()
+
+
+class QuestionBank:
+    """
+    every question ever fetched, indexed by (category, difficulty, type), so games can go on without the api
+    the questions are appended to a json lines file, path None keeps them in memory only
+    """
+
+    # random draws pick tries before scanning for the questions that aren't excluded
+    PICK_DRAWS = 16
+
+    def __init__(self, path: Optional[str]):
+        self.path = path
+
+        self._questions: Dict[str, dict] = {}
+        self._ids: List[str] = []
+        self._index: Dict[Tuple[str, str, str], List[str]] = defaultdict(list)
+        self._write_lock = asyncio.Lock()
+
+    def load(self):
+        if self.path is None:
+            return
+
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                lines = f.readlines()
+        except FileNotFoundError:
+            return
+
+        for line in lines:
+            try:
+                self._insert(json.loads(line))
+            except (ValueError, KeyError):
+                # the last write was cut short
+                continue
+
+    def _insert(self, question) -> bool:
+        id_ = question_id(question)
+
+        if id_ in self._questions:
+            return False
+
+        self._questions[id_] = question
+        self._ids.append(id_)
+        self._index[(question["category"], question["difficulty"], question["type"])].append(id_)
+        return True
+
+    def add(self, questions: List[dict]):
+        new = [question for question in questions if self._insert(question)]
+
+        if len(new) > 0 and self.path is not None:
+            asyncio.ensure_future(self._write(new))
+
+    async def _write(self, questions):
+        data = "".join(json.dumps(question) + "\n" for question in questions)
+
+        async with self._write_lock:
+            await asyncio.get_running_loop().run_in_executor(None, self._append, data)
+
+    def _append(self, data):
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(data)
+
+    def pick(self, exclude: Set[str], category=None, difficulty=None, type=None) -> Optional[dict]:
+        """a random question whose id isn't in exclude, None filters match anything"""
+        if category is None and difficulty is None and type is None:
+            buckets = [self._ids]
+        else:
+            buckets = [ids for (q_category, q_difficulty, q_type), ids in self._index.items()
+                       if category in (None, q_category) and difficulty in (None, q_difficulty)
+                       and type in (None, q_type)]
+
+        total = sum(len(ids) for ids in buckets)
+
+        # a game only excludes the few questions it asked, random draws almost always land on a new one
+        for _ in range(min(total, self.PICK_DRAWS)):
+            idx = random.randrange(total)
+
+            for ids in buckets:
+                if idx < len(ids):
+                    break
+                idx -= len(ids)
+
+            if ids[idx] not in exclude:
+                return self._questions[ids[idx]]
+
+        candidates = [id_ for ids in buckets for id_ in ids if id_ not in exclude]
+
+        if len(candidates) == 0:
+            return None
+
+        return self._questions[random.choice(candidates)]
+
+    def __len__(self):
+        return len(self._questions)
+
+
+class QuestionFeed:
+    """
+    the questions of a game, fetched BATCH at a time before the rounds need them
+    the bank fills in while the api is slow or down, a question is never asked twice in the same game
+    """
+
+    BATCH = 50
+
+    # a new batch is fetched once fewer questions than this are buffered
+    LOW_WATER = 5
+
+    # seconds a round waits for the api when the bank has nothing new
+    TIMEOUT = 10
+
+    def __init__(self, bank: QuestionBank, token: Optional[str] = None, seen=()):
+        self.bank = bank
+        self.token = token
+        self.seen: Set[str] = set(seen)
+
+        self._buffer = deque()
+        self._fetching: Optional[asyncio.Task] = None
+
+    def prefetch(self):
+        if self._fetching is None and len(self._buffer) < self.LOW_WATER:
+            self._fetching = asyncio.ensure_future(self._fetch())
+
+    async def _fetch(self):
+        try:
+            questions = await self._request_batch()
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            logger.warning("couldn't fetch trivia questions: %r", e)
+            questions = []
+        except Exception:
+            # a malformed payload or anything else, the bank still serves the rounds
+            logger.exception("couldn't fetch trivia questions")
+            questions = []
+        finally:
+            self._fetching = None
+
+        self.bank.add(questions)
+        self._buffer.extend(question for question in questions if question_id(question) not in self.seen)
+
+    async def _request_batch(self):
+        for _ in range(2):
+            if self.token is None:
+                self.token = (await _get_json(f"{API}/api_token.php?command=request"))["token"]
+
+            data = await _get_json(f"{API}/api.php?amount={self.BATCH}&token={self.token}&encode=base64")
+
+            if data["response_code"] in (TOKEN_NOT_FOUND, TOKEN_EMPTY):
+                # expired or used up, a new one starts over
+                self.token = None
+                continue
+
+            return [decode_question(raw) for raw in data["results"]]
+
+        return []
+
+    def _take(self) -> Optional[dict]:
+        while len(self._buffer) > 0:
+            question = self._buffer.popleft()
+            if question_id(question) not in self.seen:
+                return question
+
+        return None
+
+    async def next(self) -> dict:
+        question = self._take()
+
+        if question is None:
+            # no waiting on the api when the bank has something new
+            question = self.bank.pick(self.seen)
+
+        if question is None:
+            self.prefetch()
+            await asyncio.wait({self._fetching}, timeout=self.TIMEOUT)
+            question = self._take()
+
+        if question is None:
+            raise RuntimeError("no trivia question available, the api can't be reached and the bank has no new ones")
+
+        self.seen.add(question_id(question))
+        self.prefetch()
+
+        return question
@@ -1,31 +1,13 @@
-import base64
 import math
 import random
 
-import aiohttp
 import discord
 
 from games.Game import EndGame
 from games.GameHasTimeout import GameWithTimeout
 from games.GamePlayer import GamePlayer
 from games.GameSetting import GameSetting
-
-
-def decode_data(data):
-    data = data.copy()
-    if isinstance(data, dict):
-        for key in data:
-            if isinstance(data[key], str):
-                data[key] = base64.b64decode(data[key]).decode()
-            else:
-                data[key] = decode_data(data[key])
-    else:
-        for idx in range(len(data)):
-            if isinstance(data[idx], str):
-                data[idx] = base64.b64decode(data[idx]).decode()
-            else:
-                data[idx] = decode_data(data[idx])
-    return data
+from games.game_modules.trivia.questions import QuestionFeed
 
 
 def bar(size, value, letter):
@@ -38,6 +20,16 @@ class TriviaGamePlayer(GamePlayer):
         self.response = None
         self.points = 0
 
+    def snapshot_state(self):
+        state = super(TriviaGamePlayer, self).snapshot_state()
+        state.update(response=self.response, points=self.points)
+        return state
+
+    def restore_state(self, state):
+        super(TriviaGamePlayer, self).restore_state(state)
+        self.response = state["response"]
+        self.points = state["points"]
+
 
 class TriviaGame(GameWithTimeout):
     game_name = "trivia"
@@ -51,8 +43,8 @@ class TriviaGame(GameWithTimeout):
 
     def __init__(self, cog, channel, players, settings):
         super().__init__(cog, channel, players, settings)
-        self.trivia_token = None
         self.trivia_question = None
+        self.questions = QuestionFeed(cog.question_bank)
 
         self.answers = None
         self.correct_answer_idx = None
@@ -64,29 +56,69 @@ class TriviaGame(GameWithTimeout):
         for player in self.players:
             player.points = self.settings["initial_barrier_span"]
 
+    def snapshot_state(self):
+        state = super(TriviaGame, self).snapshot_state()
+        state.update(trivia_token=self.questions.token,
+                     seen=sorted(self.questions.seen),
+                     trivia_question=self.trivia_question,
+                     answers=self.answers,
+                     correct_answer_idx=self.correct_answer_idx,
+                     barrier_span=self.barrier_span,
+                     barrier=self.barrier)
+        return state
+
+    def restore_state(self, state):
+        super(TriviaGame, self).restore_state(state)
+        self.questions = QuestionFeed(self.cog.question_bank, state["trivia_token"],
+                                      state.get("seen", ()))
+        self.trivia_question = state["trivia_question"]
+        self.answers = state["answers"]
+        self.correct_answer_idx = state["correct_answer_idx"]
+        self.barrier_span = state["barrier_span"]
+        self.barrier = state["barrier"]
+
+        if self.trivia_question is not None:
+            self.build_embed()
+
+    async def on_resume(self):
+        await super(TriviaGame, self).on_resume()
+
+        # the question is sent again unless the round is over and the next one is scheduled
+        if self.trivia_question is not None and len(self._scheduled) == 0:
+            await self.players.send(embed=self.embed)
+
     async def fetch_question(self):
-        async with aiohttp.request("GET", f"https://opentdb.com/api.php?amount=1"
-                                          f"&token={self.trivia_token}&encode=base64") as response:
-            self.trivia_question = decode_data((await response.json())["results"][0])
+        self.trivia_question = await self.questions.next()
 
     async def on_start(self):
         await super(TriviaGame, self).on_start()
-        async with aiohttp.request("GET", "https://opentdb.com/api_token.php?command=request") as response:
-            self.trivia_token = (await response.json())["token"]
+        # token and first batch are requested in the background, the bank serves the first round if it has to
+        self.questions.prefetch()
 
         await self.start_round()
 
-    async def on_message(self, message, player):
+    def parse_response(self, content):
+        """the answer a message stands for, None if it isn't one"""
         if self.trivia_question["type"] == "boolean":
-            content = message.content
-            player.response = content.lower() in ("y", "yes", "true", "1", "on", "ye", "true")
-        else:
-            try:
-                value = int(message.content)
-            except ValueError:
-                pass
-            else:
-                player.response = value
+            return content.lower() in ("y", "yes", "true", "1", "on", "ye", "true")
+
+        try:
+            return int(content)
+        except ValueError:
+            return None
+
+    def message_collapse_key(self, message, player):
+        # only the latest answer counts, messages that aren't answers don't replace it
+        if self.trivia_question is not None and self.parse_response(message.content) is not None:
+            return "response", player.id
+
+        return None
+
+    async def on_message(self, message, player):
+        value = self.parse_response(message.content)
+
+        if value is not None:
+            player.response = value
 
     async def close_round(self):
         skew = 0
@@ -184,6 +216,16 @@ class TriviaGame(GameWithTimeout):
         self.reset_timer()
 
     def process_question(self):
+        if self.trivia_question["type"] != "boolean":
+            self.answers = self.trivia_question["incorrect_answers"].copy()
+            random.shuffle(self.answers)
+
+            self.correct_answer_idx = random.randrange(0, len(self.answers))
+            self.answers.insert(self.correct_answer_idx, self.trivia_question["correct_answer"])
+
+        self.build_embed()
+
+    def build_embed(self):
         color = 0x44aa44
         if self.trivia_question["difficulty"] == "medium":
             color = 0x777744
@@ -197,12 +239,6 @@ class TriviaGame(GameWithTimeout):
         if self.trivia_question["type"] == "boolean":
             self.embed.add_field(name="Is this true or false?", value="\u200C")
         else:
-            self.answers = self.trivia_question["incorrect_answers"].copy()
-            random.shuffle(self.answers)
-
-            self.correct_answer_idx = random.randrange(0, len(self.answers))
-            self.answers.insert(self.correct_answer_idx, self.trivia_question["correct_answer"])
-
             self.embed.add_field(name="send the index of the correct answer:", value="\n"
                                  .join(f"{idx}: {answer}" for idx, answer in enumerate(self.answers)))
 
@@ -0,0 +1,99 @@
+import random
+from typing import List, Callable, Dict, Tuple
+
+from games.game_modules.uno.registry import CardInstance, ChangeColorOnPlaceCardType, PLAYABLE, generate_deck
+
+
+class UnoDeck:
+    """the draw pile and the discard pile, played cards go back to the draw pile when it runs out"""
+
+    def __init__(self, on_reshuffle: Callable[[], None] = lambda: None):
+        self.draw_pile: List[CardInstance] = generate_deck()  # the top is the end
+        self.discard_pile: List[CardInstance] = []
+        self.on_reshuffle = on_reshuffle
+        self.reshuffles = 0
+
+        # (pending draw, top card code) -> for each position of the draw pile, the closest playable one at or below
+        # it stays valid while cards are only taken from the top
+        self._next_playable: Dict[Tuple[bool, int], List[int]] = {}
+
+    @property
+    def top(self):
+        return self.discard_pile[-1] if len(self.discard_pile) > 0 else None
+
+    def discard(self, card: CardInstance):
+        self.discard_pile.append(card)
+
+    def draw(self, quantity: int) -> List[CardInstance]:
+        while quantity > len(self.draw_pile):
+            self.refill()
+
+        start = len(self.draw_pile) - quantity
+        ret = self.draw_pile[start:]
+        del self.draw_pile[start:]
+        ret.reverse()
+
+        return ret
+
+    def draw_until_playable(self, top: CardInstance, pending_draw: bool) -> List[CardInstance]:
+        """draws until a card that can be placed over top, which is the last one drawn"""
+        ret = []
+
+        while True:
+            idx = self._next_playable_idx(top, pending_draw)
+
+            if idx >= 0:
+                ret.extend(self.draw(len(self.draw_pile) - idx))
+                return ret
+
+            ret.extend(self.draw(len(self.draw_pile)))
+            self.refill()
+
+    def _next_playable_idx(self, top: CardInstance, pending_draw: bool):
+        if len(self.draw_pile) == 0:
+            return -1
+
+        key = (pending_draw, top.code)
+        index = self._next_playable.get(key)
+
+        if index is None:
+            playable = PLAYABLE[pending_draw][top.code]
+            index = self._next_playable[key] = []
+            last = -1
+
+            for idx, card in enumerate(self.draw_pile):
+                if playable[card.code]:
+                    last = idx
+                index.append(last)
+
+        return index[len(self.draw_pile) - 1]
+
+    def refill(self):
+        """shuffles the discard pile (but its top) under the draw pile, a new deck is used if there's nothing to shuffle"""
+        recycled = self.discard_pile[:-1]
+        del self.discard_pile[:-1]
+
+        if len(recycled) == 0:
+            # every card is in someone's hand
+            recycled = generate_deck()
+        else:
+            for card in recycled:
+                if issubclass(card.cls, ChangeColorOnPlaceCardType):
+                    # wild cards lose the color they were given
+                    card.color = None
+
+            random.shuffle(recycled)
+
+        self.draw_pile[:0] = recycled
+        self._next_playable.clear()
+
+        self.reshuffles += 1
+        self.on_reshuffle()
+
+    def restore(self, draw_pile: List[CardInstance], discard_pile: List[CardInstance]):
+        self.draw_pile = draw_pile
+        self.discard_pile = discard_pile
+        self._next_playable.clear()
+
+    def __len__(self):
+        return len(self.draw_pile)
@@ -1,5 +1,7 @@
 import random
+import sys
 from enum import Enum
+from types import SimpleNamespace
 
 import discord
 
@@ -143,14 +145,14 @@ class Color(Enum):
     async def begin(cls, game):
         embed = discord.Embed(title="Pick a color", description="", color=0x00ff00)
 
-        game.bound_message = await game.current_player.send(embed=embed)
+        game.bound_message = await game.current_player.send_now(embed=embed)
 
         for emoji in emoji_to_color:
             await game.bound_message.add_reaction(emoji)
 
     @classmethod
     async def finish(cls, game, value):
-        game.round_timeout += 5
+        game.extend_timer(5)
         game.attributes[game.filling_attribute] = value
         await game.next_attribute_filling()
 
@@ -176,16 +178,95 @@ emoji_to_color = {
 
 
 class CardInstance:
+    """a card, its code indexes the precomputed tables below"""
+
+    __slots__ = ("cls", "number", "_color", "code")
+
     def __init__(self, cls, color, number):
+        self.cls = cls
         self.number = number
         self.color = color
-        self.cls = cls
 
-    def __getattr__(self, item):
-        def _(*args, **kwargs):
-            return getattr(self.cls, item)(self, *args, **kwargs)
+    @property
+    def color(self):
+        return self._color
+
+    @color.setter
+    def color(self, value):
+        # wild cards get a color when placed, which makes them a different kind of card
+        self._color = value
+        self.code = CARD_CODES[(self.cls, value, self.number)]
+
+    def other_place_attempt(self, other, game):
+        return PLAYABLE[game.cards_to_take > 0][self.code][other.code] == 1
+
+    def get_user_friendly(self):
+        return DISPLAY[self.code]
+
+    async def place(self, game, attributes):
+        return await self.cls.place(self, game, attributes)
+
+    async def force_place(self, game):
+        return await self.cls.force_place(self, game)
+
+    def required_attributes(self):
+        return self.cls.required_attributes(self)
+
+    @classmethod
+    def from_code(cls, code):
+        return cls(*CARD_KINDS[code])
+
+
+# the index of a card type is how it is checkpointed
+CARD_TYPES = (CardType, ChangeColorOnPlaceCardType, ReverseDirection, BlockPersonCardType,
+              AdversaryPayCardType, AdversaryPayColorOnPlaceCardType)
+
+
+def _card_kinds():
+    """every (type, color, number) a card can have, wild cards included once they have a color"""
+    colors = [Color(c) for c in range(1, 5)]
+
+    for color in colors:
+        for number in range(10):
+            yield CardType, color, number
+
+        yield BlockPersonCardType, color, None
+        yield ReverseDirection, color, None
+        yield AdversaryPayCardType, color, 2
+
+    for color in (None, *colors):
+        yield ChangeColorOnPlaceCardType, color, None
+        yield AdversaryPayColorOnPlaceCardType, color, 4
+
+
+CARD_KINDS = tuple(_card_kinds())
+CARD_CODES = {kind: code for code, kind in enumerate(CARD_KINDS)}
+
+
+def _build_tables():
+    cards = [CardInstance.from_code(code) for code in range(len(CARD_KINDS))]
+
+    # playable[pending draw][top card code][candidate card code], the rules are only asked once per combination
+    playable = tuple(tuple(bytes(int(top.cls.other_place_attempt(top, candidate,
+                                                                 SimpleNamespace(cards_to_take=pending)))
+                                 for candidate in cards)
+                           for top in cards)
+                     for pending in (0, 1))
+
+    display = tuple(sys.intern(card.cls.get_user_friendly(card)) for card in cards)
+
+    return playable, display
+
+
+PLAYABLE, DISPLAY = _build_tables()
+
+
+def encode_card(card: CardInstance):
+    return card.code
+
 
-        return _
+def decode_card(code: int) -> CardInstance:
+    return CardInstance.from_code(code)
 
 
 def generate_deck():
@@ -1,10 +1,11 @@
 from enum import Enum
-from typing import Dict, List, Callable, Collection
+from typing import Dict, List, Collection
 
 import discord
 
 from games.GamePlayer import GamePlayer
 from games.game_modules.uno import registry
+from games.game_modules.uno.deck import UnoDeck
 from games.game_modules.uno.registry import CardInstance
 from games.round.RoundAction import RoundAction, Verb, Literal, Category
 from games.round.RoundGame import RoundGame
@@ -20,12 +21,17 @@ class UnoGamePlayer(GamePlayer):
         super().__init__(user, bound_channel)
         self.hand = []
 
+    def snapshot_state(self):
+        state = super(UnoGamePlayer, self).snapshot_state()
+        state["hand"] = [registry.encode_card(card) for card in self.hand]
+        return state
+
+    def restore_state(self, state):
+        super(UnoGamePlayer, self).restore_state(state)
+        self.hand = [registry.decode_card(card) for card in state["hand"]]
+
     def draw_n_cards(self, quantity: int, add_last=True):
-        global_deck = self.game_instance.global_deck
-        ret = []
-        for i in range(quantity):
-            ret.append(global_deck.pop())
-            self.game_instance.check_regen_deck()
+        ret = self.game_instance.deck.draw(quantity)
         self.game_instance.add_round_action(GetCardAction(self, quantity))
 
         if add_last:
@@ -35,13 +41,10 @@ class UnoGamePlayer(GamePlayer):
 
         return ret
 
-    def draw_until(self, condition: Callable[[CardInstance], bool], add_last=True):
-        global_deck = self.game_instance.global_deck
-        ret = []
-        while not condition(global_deck[-1]):
-            ret.append(global_deck.pop())
-            self.game_instance.check_regen_deck()
-        ret.append(global_deck.pop())
+    def draw_until_playable(self, add_last=True):
+        """draws until a card that can be played, which is the last one"""
+        game = self.game_instance
+        ret = game.deck.draw_until_playable(game.last_played, game.cards_to_take > 0)
         self.game_instance.add_round_action(GetCardAction(self, len(ret)))
 
         if add_last:
@@ -61,8 +64,8 @@ class UnoGame(RoundGame):
 
         self.state = None  # holds the game current state
         self.players_decks: Dict[int, List[CardInstance]] = {}
-        self.global_deck = registry.generate_deck()
-        self.last_played = None
+        # the top of the discard pile is the last played card
+        self.deck = UnoDeck(on_reshuffle=lambda: self.add_round_action(DeckRegen()))
 
         self.cards_to_take = 0
 
@@ -77,12 +80,63 @@ class UnoGame(RoundGame):
     async def on_start(self):
         await super(UnoGame, self).on_start()
         for player in self.players:
-            for i in range(7):
-                player.hand.append(self.global_deck.pop())
+            player.hand.extend(self.deck.draw(7))
 
-        self.last_played = self.global_deck.pop()
+        self.last_played = self.deck.draw(1)[0]
         await self.last_played.force_place(self)
 
+    @property
+    def last_played(self):
+        return self.deck.top
+
+    @last_played.setter
+    def last_played(self, card):
+        self.deck.discard(card)
+
+    def snapshot_state(self):
+        state = super(UnoGame, self).snapshot_state()
+
+        def encode(card):
+            return registry.encode_card(card) if card is not None else None
+
+        state.update(draw_pile=[registry.encode_card(card) for card in self.deck.draw_pile],
+                     discard_pile=[registry.encode_card(card) for card in self.deck.discard_pile],
+                     cards_to_take=self.cards_to_take,
+                     state=self.state.value if self.state is not None else None,
+                     selected_card=encode(self.selected_card),
+                     attributes={key: val.value for key, val in self.attributes.items()},
+                     requested_attributes=list(self.requested_attributes or ()),
+                     filling_attribute=self.filling_attribute)
+        # the round actions of a half finished round are not kept, they are just narration
+        return state
+
+    def restore_state(self, state):
+        super(UnoGame, self).restore_state(state)
+
+        def decode(data):
+            return registry.decode_card(data) if data is not None else None
+
+        self.deck.restore([registry.decode_card(card) for card in state["draw_pile"]],
+                          [registry.decode_card(card) for card in state["discard_pile"]])
+        self.cards_to_take = state["cards_to_take"]
+        self.state = State(state["state"]) if state["state"] is not None else None
+        self.selected_card = decode(state["selected_card"])
+
+        required = self.selected_card.required_attributes() if self.selected_card is not None else {}
+        self.attributes = {key: required[key](val) for key, val in state["attributes"].items()}
+        self.requested_attributes = {key: required[key] for key in state["requested_attributes"]}
+        self.filling_attribute = state["filling_attribute"]
+        self.attribute_request_type = required.get(self.filling_attribute)
+
+    async def on_resume(self):
+        await super(UnoGame, self).on_resume()
+
+        if self.state == State.CARD_PICK:
+            await self.begin_round()
+        elif self.state == State.FILL_ATTRIBUTES and self.attribute_request_type is not None:
+            # the message that was being reacted is not known anymore
+            await self.attribute_request_type.begin(self)
+
     async def timeout_round(self):
         await self.draw_cards(True)
 
@@ -110,11 +164,6 @@ class UnoGame(RoundGame):
     def is_win(self):
         return len(self.current_player.hand) == 0
 
-    def check_regen_deck(self):
-        if len(self.global_deck) < 10:
-            self.global_deck.extend(registry.generate_deck())
-            self.add_round_action(DeckRegen())
-
     async def on_message(self, message, player):
         if player.id == self.current_player.id:
             # the message is from current player
@@ -129,10 +178,10 @@ class UnoGame(RoundGame):
                     if 0 <= selection < len(self.current_player.hand):
                         selected_card = self.current_player.hand[selection]
 
-                        allowed = self.last_played.other_place_attempt(selected_card, self)
+                        allowed = self.can_play(selected_card)
 
                         if allowed:
-                            self.round_timeout += 5
+                            self.extend_timer(5)
                             self.current_player.hand.pop(selection)
                             await self.pick_card(selected_card)
                         else:
@@ -146,13 +195,19 @@ class UnoGame(RoundGame):
         if self.state == State.FILL_ATTRIBUTES:
             await self.attribute_request_type.on_reaction_add(self, reaction, player)
 
+    def can_play(self, card):
+        return self.last_played.other_place_attempt(card, self)
+
     def list_deck(self, deck):
+        playable = registry.PLAYABLE[self.cards_to_take > 0][self.last_played.code]
+        display = registry.DISPLAY
+
         ret = []
         for idx, card in enumerate(deck):
-            if self.last_played.other_place_attempt(card, self):
-                ret.append(f"__`{idx}: `__{card.get_user_friendly()}")
+            if playable[card.code]:
+                ret.append(f"__`{idx}: `__{display[card.code]}")
             else:
-                ret.append(f"`{idx}: `{card.get_user_friendly()}")
+                ret.append(f"`{idx}: `{display[card.code]}")
         return "\n".join(ret)
 
     async def pick_card(self, card):
@@ -177,7 +232,7 @@ class UnoGame(RoundGame):
 
     async def draw_cards(self, forced=False):
         if self.cards_to_take == 0:
-            drawn_cards = self.current_player.draw_until(lambda c: self.last_played.other_place_attempt(c, self), False)
+            drawn_cards = self.current_player.draw_until_playable(False)
             if forced:
                 self.last_played = drawn_cards[-1]
                 await self.last_played.force_place(self)
@@ -234,4 +289,4 @@ class DeckRegen(RoundAction):
         super().__init__(None)
 
     def represent(self, is_first_person) -> Collection[Category]:
-        return Literal(f"the deck regenerates"),
+        return Literal(f"the discard pile is shuffled into the deck"),
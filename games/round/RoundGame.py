@@ -1,10 +1,11 @@
 from abc import abstractmethod
 from enum import Enum
-from typing import List, Sequence
+from typing import List, Sequence, Tuple, Dict
 
 from games.Game import EndGame, LeaveReason
 from games.GameHasTimeout import GameWithTimeout
 from games.round.RoundAction import RoundAction, Category, Verb, Literal
+from util.eager_gather import eager_gather
 from util.human_join_list import human_join_list
 
 
@@ -83,6 +84,47 @@ def equal_action_join(actions: Sequence[Sequence[Category]]):
     return " ".join(ret)
 
 
+def render_round_actions(list_of_actions: Sequence[RoundAction]) -> Tuple[str, Dict]:
+    """
+    renders the actions from every perspective at once, returns the text of the players that authored none of them
+    and the text of each author; each run of actions of an author is joined only in first and third person
+    """
+    runs = []  # consecutive actions of the same author
+
+    for action in list_of_actions:
+        author = action.get_author()
+
+        if len(runs) == 0 or runs[-1][0] != author:
+            runs.append((author, []))
+
+        runs[-1][1].append(action)
+
+    third_person = []
+    first_person = []
+
+    for idx, (author, actions) in enumerate(runs):
+        text = action_join([action.represent(False) for action in actions])
+
+        if author is None:
+            # not tied to anyone, so it isn't referenced
+            third_person.append(text)
+            first_person.append(text)
+        else:
+            you = "You " if idx == len(runs) - 1 else "you "
+            third_person.append(f"{author.mention} {text}")
+            first_person.append(you + action_join([action.represent(True) for action in actions]))
+
+    others = human_join_list(third_person, analyse_contents=True)
+
+    by_author = {}
+    for author in dict.fromkeys(author for author, _ in runs if author is not None):
+        texts = [first if run_author == author else third
+                 for (run_author, _), first, third in zip(runs, first_person, third_person)]
+        by_author[author] = human_join_list(texts, analyse_contents=True)
+
+    return others, by_author
+
+
 class RoundGame(GameWithTimeout):
     def __init__(self, cog, channel, players, settings):
         super().__init__(cog, channel, players, settings)
@@ -91,6 +133,7 @@ class RoundGame(GameWithTimeout):
         self.direction = Direction.DOWN_WARDS
 
         self.queued_round_actions: List[RoundAction] = []
+        self._rendered_round_actions = None
 
     async def on_start(self):
         await super(RoundGame, self).on_start()
@@ -111,6 +154,26 @@ class RoundGame(GameWithTimeout):
     def is_win(self):
         pass
 
+    def snapshot_state(self):
+        state = super(RoundGame, self).snapshot_state()
+
+        def player_id(idx):
+            return self.players[idx].id if 0 <= idx < len(self.players) else None
+
+        # by id, players that can't be restored are left out
+        state.update(current_player=player_id(self.current_player_idx),
+                     next_player=player_id(self.next_player_idx),
+                     direction=self.direction.value)
+        return state
+
+    def restore_state(self, state):
+        super(RoundGame, self).restore_state(state)
+        ids = [player.id for player in self.players]
+
+        self.current_player_idx = ids.index(state["current_player"]) if state["current_player"] in ids else 0
+        self.next_player_idx = ids.index(state["next_player"]) if state["next_player"] in ids else 0
+        self.direction = Direction(state["direction"])
+
     async def player_leave(self, player, reason=LeaveReason.BY_COMMAND):
         if self.current_player.id == player.id:
             await self.end_round()
@@ -132,50 +195,27 @@ class RoundGame(GameWithTimeout):
 
     def add_round_action(self, action):
         self.queued_round_actions.append(action)
+        self._rendered_round_actions = None
 
-    async def update_round_actions(self):
-        for player in self.players:
-            await player.send(self.compose_round_actions(self.queued_round_actions, player))
-
-        self.queued_round_actions.clear()
-
-    def compose_round_actions(self, list_of_actions, for_player) -> str:
-        chunk = []
-        about_player = None
-        same_player_chunks = []
-
-        for action in list_of_actions:
-            author = action.get_author()
-
-            if author != about_player:
-                if len(chunk) > 0:
-
-                    same_player_chunk = ""
+    def rendered_round_actions(self) -> Tuple[str, Dict]:
+        """render_round_actions of the queued actions, cached until they change"""
+        if self._rendered_round_actions is None:
+            self._rendered_round_actions = render_round_actions(self.queued_round_actions)
 
-                    if about_player is not None:
-                        # if the action is tied to someone, we should reference the author
-                        same_player_chunk += "you " if for_player == about_player else (about_player.mention + " ")
+        return self._rendered_round_actions
 
-                    same_player_chunk += action_join(chunk)
-                    same_player_chunks.append(same_player_chunk)
-                    chunk.clear()
-
-                about_player = author
-
-            chunk.append(action.represent(for_player == author))
-
-        if len(chunk) > 0:
-
-            same_player_chunk = ""
-
-            if about_player is not None:
-                same_player_chunk += "You " if for_player == about_player else (about_player.mention + " ")
+    async def update_round_actions(self):
+        if len(self.queued_round_actions) > 0:
+            others, by_author = self.rendered_round_actions()
 
-            same_player_chunk += action_join(chunk)
+            await eager_gather(*(player.send(by_author.get(player, others)) for player in self.players))
 
-            same_player_chunks.append(same_player_chunk)
+        self.queued_round_actions.clear()
+        self._rendered_round_actions = None
 
-        return human_join_list(same_player_chunks, analyse_contents=True)
+    def compose_round_actions(self, list_of_actions, for_player) -> str:
+        others, by_author = render_round_actions(list_of_actions)
+        return by_author.get(for_player, others)
 
     def cycle(self):
         if self.direction == Direction.UP_WARDS:
@@ -1,13 +1,20 @@
-import inspect
 import json
 import os
-from functools import wraps
 
 import discord
 from discord import PartialEmoji
 from discord.ext import commands
 from discord.message import convert_emoji_reaction
 
+from reactive_message.HoistCoordinator import HoistCoordinator
+from reactive_message.LifecycleManager import LifecycleManager
+from reactive_message.PermissionWatcher import PermissionWatcher
+from reactive_message.ReactiveMessageRouter import ReactiveMessageRouter
+from reactive_message.SnapshotStore import SnapshotStore
+from util import http_client
+from util.http_cache import HttpCache
+from util.keyed_waiters import KeyedWaiters
+
 try:
     with open("config.json") as f:
         t = json.loads(f.read())
@@ -22,29 +29,22 @@ def get_env_value(value: str):
     return ret
 
 
-def _listener_bind(method, self, obj):
-    for attr, func in inspect.getmembers(obj, inspect.ismethod):
-        if attr.startswith("on_"):
-            getattr(self, method)(func, attr)
-
-
-def _true_partial(func, *args, **kwargs):
-    # this exists because functool's partial returns a class instead of a function
-    # and we still want _listener_bind to receive 'self'
-
-    @wraps(func)
-    def wrapper(*g_args, **g_kwargs):
-        return func(*args, *g_args, **kwargs, **g_kwargs)
-
-    return wrapper
-
-
 class DiscordBot(commands.Bot):
     get_env_value = staticmethod(get_env_value)
 
     def __init__(self, command_prefix, **options):
         super().__init__(command_prefix, **options)
 
+        self.reactive_router = ReactiveMessageRouter(self)
+        self.keyed_waiters = KeyedWaiters(self.loop)
+        self.permission_watcher = PermissionWatcher(self)
+        self.hoist_coordinator = HoistCoordinator(self)
+        self.reactive_lifecycle = LifecycleManager(self)
+        self.reactive_snapshots = SnapshotStore(self, "reactive_messages.json")
+        self.http_client = http_client.client
+        self.http_client.cache = HttpCache("http_cache")
+        self.http_client.cache.load()
+
         self.load_extension("jishaku")
 
         with open("cogs/cogs") as cogs_file:
@@ -54,12 +54,39 @@ class DiscordBot(commands.Bot):
                 self.load_extension(f"cogs.{line}")
                 print(f"loaded {line}")
 
+        # after the cogs, so the persistent classes are known
+        self.reactive_snapshots.load()
+
     async def on_ready(self):
+        self.reactive_snapshots.start()
         await self.change_presence(activity=discord.Game(name=f"prefix {self.command_prefix}command"))
 
+    async def close(self):
+        # also reached on SIGTERM, which is how the worker is restarted on deploys
+        self.reactive_snapshots.close()
+
+        # gives the cogs a chance to save what they hold
+        for extension in tuple(self.extensions):
+            self.unload_extension(extension)
+
+        await super().close()
+        await self.http_client.close()
+
     def dispatch(self, event_name, *args, **kwargs):
         super().dispatch("event", event_name, *args, **kwargs)
         super().dispatch(event_name, *args, **kwargs)
+        self.keyed_waiters.dispatch(event_name, *args)
+        self.permission_watcher.dispatch(event_name, *args)
+        self.hoist_coordinator.dispatch(event_name, *args)
+        self.reactive_snapshots.dispatch(event_name, *args)
+        self.reactive_router.dispatch(event_name, *args, **kwargs)
+
+    def wait_for(self, event, *, check=None, timeout=None, key=None):
+        # waits with a key are resolved with a lookup, the check only runs for events with a matching key
+        if key is None:
+            return super().wait_for(event, check=check, timeout=timeout)
+
+        return self.keyed_waiters.wait(event.lower(), key, check, timeout)
 
     async def choice(self, message, *reactions, check=lambda ev: True) -> PartialEmoji:
         for reaction in reactions:
@@ -70,10 +97,10 @@ class DiscordBot(commands.Bot):
             if not any(convert_emoji_reaction(p) == convert_emoji_reaction(r) for r in reactions):
                 return False
 
-            if ev.message_id == message.id and self.user.id != ev.user_id:
+            if self.user.id != ev.user_id:
                 return check(ev)
 
-        return (await self.wait_for("raw_reaction_add", check=c, timeout=40)).emoji
+        return (await self.wait_for("raw_reaction_add", check=c, timeout=40, key=message.id)).emoji
 
     async def get_webhook_for_channel(self, channel):
         for wb in await channel.webhooks():
@@ -85,9 +112,6 @@ class DiscordBot(commands.Bot):
             except discord.Forbidden:
                 return None
 
-    add_listener_object = _true_partial(_listener_bind, "add_listener")
-    remove_listener_object = _true_partial(_listener_bind, "remove_listener")
-
 
 if __name__ == "__main__":
     token = get_env_value("token")
@@ -1,3 +1,4 @@
+import asyncio
 import random
 import typing
 from dataclasses import dataclass
@@ -6,6 +7,8 @@ from json.decoder import JSONDecodeError
 import aiohttp
 import discord
 
+from util.http_client import client
+
 
 @dataclass(frozen=True, eq=True)
 class Pronoun:
@@ -96,28 +99,30 @@ async def fetch_pronoun(subject: str) -> typing.Optional[Pronoun]:
     if subject in cache:
         return cache[subject]
 
-    async with aiohttp.ClientSession() as session:
-        async with session.get(f"https://en.pronouns.page/api/pronouns/{subject}") as response:
-            body = await response.text()
+    try:
+        response = await client.get(f"https://en.pronouns.page/api/pronouns/{subject}")
+    except (aiohttp.ClientError, asyncio.TimeoutError):
+        # not cached, it's asked again once the site is back
+        return None
 
-            if body == "":
-                return None
+    if response.body == b"":
+        return None
 
-            try:
-                json = await response.json()
+    try:
+        json = response.json()
 
-            except JSONDecodeError:
-                return None
+    except JSONDecodeError:
+        return None
 
-            else:
-                json["morphemes"]["subject"] = json["morphemes"]["pronoun_subject"]
-                json["morphemes"]["object"] = json["morphemes"]["pronoun_object"]
+    else:
+        json["morphemes"]["subject"] = json["morphemes"]["pronoun_subject"]
+        json["morphemes"]["object"] = json["morphemes"]["pronoun_object"]
 
-                del json["morphemes"]["pronoun_subject"]
-                del json["morphemes"]["pronoun_object"]
+        del json["morphemes"]["pronoun_subject"]
+        del json["morphemes"]["pronoun_object"]
 
-                pronoun = Pronoun(**json["morphemes"])
+        pronoun = Pronoun(**json["morphemes"])
 
-                cache[pronoun.subject] = pronoun
+        cache[pronoun.subject] = pronoun
 
-                return pronoun
+        return pronoun
@@ -0,0 +1,105 @@
+import asyncio
+from typing import Dict, Optional
+
+
+class ChannelHoist:
+    def __init__(self, channel_id):
+        self.channel_id = channel_id
+        self.members = {}  # dict as an ordered set, the resend order is the creation order
+        self.messages = 0  # messages sent since the last resend
+        self.last_resend = None
+        self.pending: Optional[asyncio.TimerHandle] = None
+        self.resending = False
+        self.resends = 0
+
+
+class HoistCoordinator:
+    """keeps the hoisted reactive messages of each channel at the bottom, resending them all at once"""
+
+    # resend after this many messages
+    MESSAGE_THRESHOLD = 10
+
+    # or after this many messages, if the last resend was long ago
+    STALE_MESSAGE_THRESHOLD = 3
+    STALE_SECONDS = 60
+
+    # never resend a channel more often than this
+    MIN_RESEND_INTERVAL = 15
+
+    def __init__(self, bot):
+        self.bot = bot
+        self.channels: Dict[int, ChannelHoist] = {}
+
+    def add(self, reactive_message):
+        channel_id = reactive_message.channel.id
+        hoist = self.channels.get(channel_id)
+
+        if hoist is None:
+            hoist = self.channels[channel_id] = ChannelHoist(channel_id)
+            hoist.last_resend = self.bot.loop.time()
+
+        hoist.members[reactive_message] = None
+
+    def remove(self, reactive_message):
+        channel_id = reactive_message.channel.id
+        hoist = self.channels.get(channel_id)
+
+        if hoist is None:
+            return
+
+        hoist.members.pop(reactive_message, None)
+
+        if len(hoist.members) == 0:
+            if hoist.pending is not None:
+                hoist.pending.cancel()
+            del self.channels[channel_id]
+
+    def dispatch(self, event_name, *args):
+        if event_name != "message":
+            return
+
+        message = args[0]
+        hoist = self.channels.get(message.channel.id)
+
+        if hoist is None or message.author.id == self.bot.user.id:
+            return
+
+        hoist.messages += 1
+
+        if hoist.pending is None and not hoist.resending and self.should_resend(hoist):
+            self.schedule(hoist)
+
+    def should_resend(self, hoist: ChannelHoist):
+        if hoist.messages >= self.MESSAGE_THRESHOLD:
+            return True
+
+        elapsed = self.bot.loop.time() - hoist.last_resend
+        return hoist.messages >= self.STALE_MESSAGE_THRESHOLD and elapsed >= self.STALE_SECONDS
+
+    def schedule(self, hoist: ChannelHoist):
+        loop = self.bot.loop
+        delay = max(hoist.last_resend + self.MIN_RESEND_INTERVAL - loop.time(), 0)
+
+        def start():
+            hoist.pending = None
+            asyncio.ensure_future(self.resend(hoist))
+
+        hoist.pending = loop.call_later(delay, start)
+
+    async def resend(self, hoist: ChannelHoist):
+        hoist.resending = True
+        hoist.messages = 0
+
+        try:
+            for member in tuple(hoist.members):
+                async with member.lock:
+                    if member.running and member.functional and member.current_displaying_render is not None:
+                        await member.send_from_dict(member.current_displaying_render)
+        finally:
+            hoist.resending = False
+            hoist.last_resend = self.bot.loop.time()
+            hoist.resends += 1
+
+        # the channel kept going while resending
+        if self.channels.get(hoist.channel_id) is hoist and self.should_resend(hoist):
+            self.schedule(hoist)
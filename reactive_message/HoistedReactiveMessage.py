@@ -4,13 +4,13 @@ from .ReactiveMessage import ReactiveMessage
 
 
 class HoistedReactiveMessage(ReactiveMessage, ABC):
-    def __init__(self, cog, channel):
-        super().__init__(cog, channel)
+    """a reactive message that gets resent to stay at the bottom of the channel, see HoistCoordinator"""
 
-        self.messages_until_resend = 10
+    def _register(self):
+        super(HoistedReactiveMessage, self)._register()
 
-    async def process_message(self, message):
-        self.messages_until_resend -= 1
-        if self.messages_until_resend <= 0:
-            await self.send_from_dict(self.current_displaying_render)
-            self.messages_until_resend = 10
+        self.bot.hoist_coordinator.add(self)
+
+    def _detach(self):
+        self.bot.hoist_coordinator.remove(self)
+        super(HoistedReactiveMessage, self)._detach()
@@ -0,0 +1,120 @@
+import asyncio
+from collections import OrderedDict, Counter
+from typing import Optional
+
+
+def _guild_id(reactive_message):
+    guild = getattr(reactive_message.channel, "guild", None)
+    return guild.id if guild is not None else None
+
+
+class LifecycleManager:
+    """
+    freezes reactive messages that have been idle for longer than their class' IDLE_TIMEOUT
+    and the least recently used ones once there are too many, globally or in a guild
+    the caps never evict a message nothing could thaw, like one waiting on events it subscribed to
+    """
+
+    GLOBAL_CAP = 200
+    GUILD_CAP = 25
+    SWEEP_INTERVAL = 60
+
+    def __init__(self, bot):
+        self.bot = bot
+
+        self._last_active: OrderedDict = OrderedDict()  # least recently active first
+        self._guild_counts = Counter()
+        self._sweep_handle: Optional[asyncio.TimerHandle] = None
+
+        self.frozen_idle = 0
+        self.frozen_capped = 0
+
+    def _now(self):
+        return self.bot.loop.time()
+
+    def add(self, reactive_message):
+        self._last_active[reactive_message] = self._now()
+        guild_id = _guild_id(reactive_message)
+        self._guild_counts[guild_id] += 1
+
+        self._enforce_caps(guild_id)
+
+        if self._sweep_handle is None:
+            self._sweep_handle = self.bot.loop.call_later(self.SWEEP_INTERVAL, self.sweep)
+
+    def discard(self, reactive_message):
+        if self._last_active.pop(reactive_message, None) is None:
+            return
+
+        guild_id = _guild_id(reactive_message)
+        self._guild_counts[guild_id] -= 1
+        if self._guild_counts[guild_id] <= 0:
+            del self._guild_counts[guild_id]
+
+    def touch(self, reactive_message):
+        if reactive_message in self._last_active:
+            self._last_active[reactive_message] = self._now()
+            self._last_active.move_to_end(reactive_message)
+
+    def idle_for(self, reactive_message):
+        """seconds since the message last handled an event"""
+        now = self._now()
+        return now - self._last_active.get(reactive_message, now)
+
+    def _freeze(self, reactive_message):
+        # it's discarded right away so it doesn't count against the caps while the freeze is pending
+        self.discard(reactive_message)
+        asyncio.ensure_future(reactive_message.freeze())
+
+    def _evictable(self, guild_id=None):
+        """least recently active first, the ones that couldn't be thawed are left alone"""
+        for reactive_message in tuple(self._last_active):
+            if guild_id is not None and _guild_id(reactive_message) != guild_id:
+                continue
+
+            if self.bot.reactive_router.thawable(reactive_message):
+                yield reactive_message
+
+    def _enforce_caps(self, guild_id):
+        if len(self._last_active) > self.GLOBAL_CAP:
+            for reactive_message in self._evictable():
+                self._freeze(reactive_message)
+                self.frozen_capped += 1
+
+                if len(self._last_active) <= self.GLOBAL_CAP:
+                    break
+
+        if guild_id is not None and self._guild_counts[guild_id] > self.GUILD_CAP:
+            for reactive_message in self._evictable(guild_id):
+                self._freeze(reactive_message)
+                self.frozen_capped += 1
+
+                if self._guild_counts[guild_id] <= self.GUILD_CAP:
+                    break
+
+    def sweep(self):
+        self._sweep_handle = None
+        now = self._now()
+
+        for reactive_message, last_active in tuple(self._last_active.items()):
+            timeout = reactive_message.IDLE_TIMEOUT
+            if timeout is not None and now - last_active >= timeout:
+                self._freeze(reactive_message)
+                self.frozen_idle += 1
+
+        if len(self._last_active) > 0:
+            self._sweep_handle = self.bot.loop.call_later(self.SWEEP_INTERVAL, self.sweep)
+
+    def stats(self):
+        now = self._now()
+        by_class = Counter(type(reactive_message).__name__ for reactive_message in self._last_active)
+
+        return dict(live=len(self._last_active),
+                    by_class=dict(by_class),
+                    by_guild=dict(self._guild_counts),
+                    oldest_idle=max((now - last for last in self._last_active.values()), default=0),
+                    frozen_idle=self.frozen_idle,
+                    frozen_capped=self.frozen_capped)
+
+    def __len__(self):
+        return len(self._last_active)
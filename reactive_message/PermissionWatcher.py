@@ -0,0 +1,143 @@
+import asyncio
+from collections import defaultdict
+from typing import Dict, Set, List
+
+import discord
+
+
+class PermissionWatcher:
+    """
+    caches the bot's permissions per channel and wakes the waiters of a channel only when they actually change
+    a single instance is shared by the whole bot
+    """
+
+    def __init__(self, bot):
+        self.bot = bot
+
+        self._permissions: Dict[int, discord.Permissions] = {}
+        self._channels: Dict[int, object] = {}
+        self._by_guild: Dict[int, Set[int]] = defaultdict(set)
+        self._waiters: Dict[int, List[asyncio.Future]] = {}
+
+    def _compute(self, channel) -> discord.Permissions:
+        guild = getattr(channel, "guild", None)
+        me = guild.me if guild is not None else self.bot.user
+        return channel.permissions_for(me)
+
+    def _track(self, channel):
+        self._channels[channel.id] = channel
+        guild = getattr(channel, "guild", None)
+        if guild is not None:
+            self._by_guild[guild.id].add(channel.id)
+
+    def _forget(self, channel_id):
+        channel = self._channels.pop(channel_id, None)
+        self._permissions.pop(channel_id, None)
+
+        guild = getattr(channel, "guild", None)
+        if guild is not None:
+            in_guild = self._by_guild[guild.id]
+            in_guild.discard(channel_id)
+            if len(in_guild) == 0:
+                del self._by_guild[guild.id]
+
+    def permissions_for(self, channel) -> discord.Permissions:
+        permissions = self._permissions.get(channel.id)
+
+        if permissions is None:
+            permissions = self._permissions[channel.id] = self._compute(channel)
+            self._track(channel)
+
+        return permissions
+
+    def refresh(self, channel) -> bool:
+        """
+        computes the permissions in the channel again, for when discord refused what the cache allowed
+        returns whether they changed
+        """
+        old = self.permissions_for(channel)
+        self._refresh((channel.id,))
+        return old.value != self._permissions[channel.id].value
+
+    def wait_change(self, channel, timeout=None):
+        """waits until the bot's permissions in the channel change, returns the new permissions"""
+        self.permissions_for(channel)
+
+        future = asyncio.get_running_loop().create_future()
+        waiters = self._waiters.setdefault(channel.id, [])
+        waiters.append(future)
+
+        def discard(_):
+            if future in waiters:
+                waiters.remove(future)
+            if len(waiters) == 0 and self._waiters.get(channel.id) is waiters:
+                del self._waiters[channel.id]
+
+        future.add_done_callback(discard)
+
+        return asyncio.wait_for(future, timeout)
+
+    def _refresh(self, channel_ids):
+        for channel_id in tuple(channel_ids):
+            channel = self._channels.get(channel_id)
+            if channel is None:
+                continue
+
+            old = self._permissions.get(channel_id)
+            new = self._compute(channel)
+            self._permissions[channel_id] = new
+
+            if old is None or old.value != new.value:
+                for future in tuple(self._waiters.get(channel_id, ())):
+                    if not future.done():
+                        future.set_result(new)
+
+    def _resync(self, channel_ids):
+        """swaps in the channel objects the cache holds now, they're rebuilt on reconnects, then refreshes"""
+        for channel_id in tuple(channel_ids):
+            channel = self.bot.get_channel(channel_id)
+
+            # dm channels aren't always cached, their old object is as good
+            if channel is not None:
+                self._channels[channel_id] = channel
+
+        self._refresh(channel_ids)
+
+    def _drop_guild(self, guild_id):
+        """the bot left the guild, its waiters see it lost every permission"""
+        for channel_id in tuple(self._by_guild.get(guild_id, ())):
+            for future in tuple(self._waiters.get(channel_id, ())):
+                if not future.done():
+                    future.set_result(discord.Permissions.none())
+
+            self._forget(channel_id)
+
+    def dispatch(self, event_name, *args):
+        if event_name in ("ready", "resumed"):
+            self._resync(self._channels)
+
+        elif event_name in ("guild_join", "guild_available"):
+            self._resync(self._by_guild.get(args[0].id, ()))
+
+        elif event_name == "guild_remove":
+            self._drop_guild(args[0].id)
+
+        elif event_name == "guild_update":
+            # an ownership transfer changes every permission of the old and the new owner
+            self._resync(self._by_guild.get(args[1].id, ()))
+
+        elif event_name == "guild_channel_update":
+            # the overwrites of a category reach its channels, and a channel moved picks up the ones of its new parent
+            self._resync(self._by_guild.get(args[1].guild.id, ()))
+
+        elif event_name == "guild_channel_delete":
+            self._forget(args[0].id)
+
+        elif event_name in ("guild_role_create", "guild_role_update", "guild_role_delete"):
+            role = args[-1]
+            self._refresh(self._by_guild.get(role.guild.id, ()))
+
+        elif event_name == "member_update":
+            after = args[1]
+            if after.id == self.bot.user.id:
+                self._refresh(self._by_guild.get(after.guild.id, ()))
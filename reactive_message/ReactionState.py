@@ -0,0 +1,155 @@
+from collections import deque
+from contextlib import contextmanager
+from typing import Dict, List, Tuple, Iterable, Optional
+
+# the gateway events the bot's own requests cause
+ADD = "add"
+CLEAR = "clear"
+
+
+class _Entry:
+    __slots__ = ("others", "me")
+
+    def __init__(self):
+        self.others = 0
+        self.me = False
+
+
+def reaction_edit_script(current: List[str], mine: Iterable[str], desired: Iterable[str]) -> Tuple[List[str], List[str]]:
+    """
+    returns the reactions to clear and the reactions to add (in order) to go from current to desired
+
+    discord appends new reactions at the end, so the reactions that stay must be a prefix of the desired ones;
+    the longest prefix of desired that is a subsequence of current is kept and everything else is rebuilt
+    """
+    desired = list(desired)
+    mine = set(mine)
+
+    matched = set()
+    current_idx = 0
+    kept = 0
+
+    for emoji in desired:
+        position = current_idx
+        while position < len(current) and current[position] != emoji:
+            position += 1
+
+        if position == len(current):
+            break
+
+        matched.add(position)
+        current_idx = position + 1
+        kept += 1
+
+    to_clear = [emoji for idx, emoji in enumerate(current) if idx not in matched]
+    to_add = [emoji for emoji in desired[:kept] if emoji not in mine] + desired[kept:]
+
+    return to_clear, to_add
+
+
+class ReactionState:
+    """
+    what reactions the bound message has, kept up to date by the gateway events instead of fetching
+    the bot's own requests are applied right away, the gateway events they cause are skipped when they arrive,
+    a clear sent before the bot added the same emoji again would remove it otherwise
+    """
+
+    def __init__(self):
+        self._entries: Dict[str, _Entry] = {}  # dicts keep the order discord displays them in
+        self._echoes: Dict[Optional[str], deque] = {}  # by emoji, None for a clear of every reaction
+
+    @classmethod
+    def from_reactions(cls, reactions):
+        """the state of a fetched message"""
+        state = cls()
+
+        for reaction in reactions:
+            entry = state._entries[str(reaction.emoji)] = _Entry()
+            entry.me = reaction.me
+            entry.others = reaction.count - int(reaction.me)
+
+        return state
+
+    @contextmanager
+    def request(self, emoji, event):
+        """
+        wraps a request of the bot's that adds (ADD) or clears (CLEAR) the emoji, None clears every reaction
+        the change is applied once it succeeded and its gateway event is expected
+        """
+        key = str(emoji) if emoji is not None else None
+
+        # expected before the request, the gateway can be faster than the response
+        self._echoes.setdefault(key, deque()).append(event)
+
+        try:
+            yield
+        except BaseException:
+            self._is_echo(key, event)
+            raise
+
+        if event == ADD:
+            self._add(key, True)
+        elif key is None:
+            self._entries.clear()
+        else:
+            self._entries.pop(key, None)
+
+    def _is_echo(self, key, event) -> bool:
+        echoes = self._echoes.get(key)
+        if echoes is None or event not in echoes:
+            return False
+
+        echoes.remove(event)
+        if len(echoes) == 0:
+            del self._echoes[key]
+
+        return True
+
+    def _add(self, emoji, is_me):
+        entry = self._entries.get(emoji)
+        if entry is None:
+            entry = self._entries[emoji] = _Entry()
+
+        if is_me:
+            entry.me = True
+        else:
+            entry.others += 1
+
+    def add(self, emoji, is_me):
+        emoji = str(emoji)
+        if is_me and self._is_echo(emoji, ADD):
+            return
+
+        self._add(emoji, is_me)
+
+    def remove(self, emoji, is_me):
+        emoji = str(emoji)
+        entry = self._entries.get(emoji)
+        if entry is None:
+            return
+
+        if is_me:
+            entry.me = False
+        else:
+            entry.others = max(entry.others - 1, 0)
+
+        if not entry.me and entry.others == 0:
+            del self._entries[emoji]
+
+    def clear_emoji(self, emoji):
+        emoji = str(emoji)
+        if not self._is_echo(emoji, CLEAR):
+            self._entries.pop(emoji, None)
+
+    def clear(self):
+        if not self._is_echo(None, CLEAR):
+            self._entries.clear()
+
+    def emojis(self) -> List[str]:
+        return list(self._entries)
+
+    def mine(self) -> List[str]:
+        return [emoji for emoji, entry in self._entries.items() if entry.me]
+
+    def __contains__(self, emoji):
+        return str(emoji) in self._entries
@@ -1,4 +1,7 @@
 import asyncio
+import json
+import math
+import time
 from abc import ABC, abstractmethod
 from contextlib import suppress
 from functools import wraps
@@ -6,63 +9,92 @@ from typing import Dict, Any, Optional, Iterable
 
 import discord
 
+from reactive_message.ReactionState import ReactionState, reaction_edit_script, ADD, CLEAR
+from reactive_message.ReactiveMessageRouter import RAW_REACTION_EVENTS
 from util.human_join_list import human_join_list
 
 
-def process_render_changes(o: dict, n: dict) -> Dict[str, Any]:
+def fingerprint(value):
+    """a cheap to compare stand in for a render value, embeds are serialized only once"""
+    if isinstance(value, discord.Embed):
+        return hash(json.dumps(value.to_dict(), sort_keys=True))
+
+    if isinstance(value, (list, tuple)):
+        return tuple(value)
+
+    return value
+
+
+def render_fingerprints(render: dict) -> Dict[str, Any]:
+    return {key: fingerprint(val) for key, val in render.items()}
+
+
+def process_render_changes(o: dict, n: dict, n_fingerprints: dict = None) -> Dict[str, Any]:
+    """o holds the fingerprints of the old render, n is the new render"""
+    if n_fingerprints is None:
+        n_fingerprints = render_fingerprints(n)
+
     ret = {}
     for key in o:
-        ret[key] = None
+        if key not in n:
+            ret[key] = None
 
     for key, val in n.items():
-        other_value = o.get(key, None)
-
-        if isinstance(val, discord.Embed) and isinstance(other_value, discord.Embed):
-            is_equal = other_value.to_dict() == val.to_dict()
-        elif not isinstance(val, discord.Embed) and not isinstance(other_value, discord.Embed):
-            is_equal = val == other_value
-        else:
-            is_equal = False
-
-        if is_equal:
-            del ret[key]
-        else:
+        if o.get(key, None) != n_fingerprints[key]:
             ret[key] = val
+
     return ret
 
 
-async def sync_reactions(message: discord.Message, reactions: Iterable[str]):
-    message = await message.channel.fetch_message(message.id)  # get updated message
-    message: discord.Message
+async def sync_reactions(message: discord.Message, state: ReactionState, reactions: Iterable[str]):
+    to_clear, to_add = reaction_edit_script(state.emojis(), state.mine(), reactions)
 
-    message_reactions = message.reactions
+    for reaction in to_clear:
+        with state.request(reaction, CLEAR):
+            await message.clear_reaction(reaction)
 
-    message_reaction_idx = 0
+    for reaction in to_add:
+        with state.request(reaction, ADD):
+            await message.add_reaction(reaction)
 
-    for new_reaction in reactions:
-        if message_reaction_idx < len(message_reactions):
-            while message_reaction_idx < len(message_reactions) and \
-                    new_reaction != message_reactions[message_reaction_idx].emoji:
-                await message.clear_reaction(message_reactions[message_reaction_idx])
-                message_reaction_idx += 1
 
-        if message_reaction_idx >= len(message_reactions) or not message_reactions[message_reaction_idx].me:
-            await message.add_reaction(new_reaction)
+async def send_reactions(message: discord.Message, state: ReactionState, reactions: Iterable[str]):
+    mine = state.mine()
 
-        message_reaction_idx += 1
+    for reaction in reactions:
+        if reaction not in mine:
+            with state.request(reaction, ADD):
+                await message.add_reaction(reaction)
 
-    while message_reaction_idx < len(message_reactions):
-        await message.clear_reaction(message_reactions[message_reaction_idx])
-        message_reaction_idx += 1
 
+def serialize_render(render: dict) -> dict:
+    """a json friendly copy of a render"""
+    ret = dict(render)
 
-async def send_reactions(message: discord.Message, reactions: Iterable[str]):
-    message = await message.channel.fetch_message(message.id)
+    if isinstance(ret.get("embed"), discord.Embed):
+        ret["embed"] = ret["embed"].to_dict()
 
-    for reaction in reactions:
-        message_reaction = discord.utils.get(message.reactions, emoji=reaction)
-        if message_reaction is None or not message_reaction.me:
-            await message.add_reaction(reaction)
+    if ret.get("reactions") is not None:
+        ret["reactions"] = [str(reaction) for reaction in ret["reactions"]]
+
+    return ret
+
+
+def deserialize_render(data: dict) -> dict:
+    ret = dict(data)
+
+    if ret.get("embed") is not None:
+        ret["embed"] = discord.Embed.from_dict(ret["embed"])
+
+    return ret
+
+
+# persistent reactive message classes by their key, used to rehydrate snapshots
+_persistent_classes: Dict[str, type] = {}
+
+
+def _persistence_key(cls):
+    return f"{cls.__module__}.{cls.__qualname__}"
 
 
 def format_permissions(perms):
@@ -82,7 +114,7 @@ def _strip_only_message(data):
     return ret
 
 
-def checks_updates(function=None, *, always=False):
+def checks_updates(function=None, *, always=False, immediate=False):
     def decorator(func):
         @wraps(func)
         async def wrapper(self, *args, **kwargs):
@@ -90,7 +122,7 @@ def checks_updates(function=None, *, always=False):
             async with self.lock:
                 should_update = await func(self, *args, **kwargs)
                 if should_update or always:
-                    await self.update()
+                    await self.request_update(immediate)
 
         return wrapper
 
@@ -103,14 +135,39 @@ def checks_updates(function=None, *, always=False):
 class ReactiveMessage(ABC):
     ENFORCE_REACTION_POSITIONS = True
 
+    # minimum amount of seconds between two updates requested by events, the ones in between are merged
+    UPDATE_INTERVAL = 1.0
+
+    # seconds without handling any event before being frozen, None to never freeze
+    IDLE_TIMEOUT = 60 * 60
+
+    # whether the message is snapshotted on shutdown and rehydrated after a restart, see SnapshotStore
+    PERSISTENT = False
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+
+        if cls.PERSISTENT:
+            _persistent_classes[_persistence_key(cls)] = cls
+
     def __init__(self, bot, channel):
+        self._setup(bot, channel)
+        self._register()
+
+        asyncio.get_running_loop().create_task(self.send())
+
+    def _setup(self, bot, channel):
+        """sets the attributes up, shared by new and rehydrated instances"""
         self.bot = bot
 
         self.channel: discord.TextChannel = channel
 
-        self.bound_message: Optional[discord.Message] = None
+        self._bound_message: Optional[discord.Message] = None
+        self._bound_uncached = False  # discord.py doesn't cache the bound message, so only raw events arrive
+        self.reaction_state = ReactionState()  # reactions of the bound message
 
         self.current_displaying_render = None  # what is absolutely rendered to discord
+        self.current_fingerprints = {}  # fingerprints of current_displaying_render
         self.message_render = None
         # what should be rendered; both values can be different if permission checks fail
         # as message render will be pointing to what should be rendered to discord if permissions
@@ -120,19 +177,118 @@ class ReactiveMessage(ABC):
 
         self.functional = False  # this should be false if the message cannot be rendered properly
 
+        self.frozen = False  # true if it stopped listening but the message was left as it was
+        self._active_at = 0.0  # time it was last active, kept when frozen
+
         self.lock = asyncio.Lock()
 
-        self.bot.add_listener_object(self)
+        self._last_update = -math.inf
+        self._update_pending = False
+        self._update_handle: Optional[asyncio.TimerHandle] = None
 
-        asyncio.get_running_loop().create_task(self.send())
+        self._rendered_version = None
+        self.renders_skipped = 0
+
+        self.updates_done = 0
+        self.updates_merged = 0  # edits that were avoided by merging requests
+
+    def _register(self):
+        self.bot.reactive_router.add(self)
+        self.bot.reactive_lifecycle.add(self)
+
+    @property
+    def bound_message(self) -> Optional[discord.Message]:
+        return self._bound_message
+
+    @bound_message.setter
+    def bound_message(self, message: Optional[discord.Message]):
+        # keeps the router index pointing to the message that is actually displayed
+        self.bot.reactive_router.rebind(self, self._bound_message, message)
+        self._bound_message = message
+        self._bound_uncached = False
+        self.reaction_state = ReactionState()
 
     @abstractmethod
     def render_message(self) -> Dict[str, Any]:
         raise NotImplementedError
 
+    def state_version(self):
+        """
+        a hashable value that changes whenever render_message would render something different
+        when it is the same as the last rendered one, the render is skipped; None means it can't be told
+        """
+        return None
+
+    def snapshot_state(self) -> Optional[dict]:
+        """the json friendly state restore_state needs after a restart, None if it can't be persisted right now"""
+        return {}
+
+    async def restore_state(self, state: dict) -> bool:
+        """restores what snapshot_state returned, returns False if the message can't be rehydrated"""
+        return True
+
+    def snapshot(self) -> Optional[dict]:
+        if not self.PERSISTENT or not (self.running or self.frozen) or not self.functional or \
+                self.bound_message is None:
+            return None
+
+        state = self.snapshot_state()
+        if state is None:
+            return None
+
+        # the lifecycle manager forgot a frozen message, its idle time stopped when it was frozen
+        idle = self.bot.reactive_lifecycle.idle_for(self) if self.running else time.time() - self._active_at
+
+        return dict(cls=_persistence_key(type(self)),
+                    channel_id=self.channel.id,
+                    message_id=self.bound_message.id,
+                    render=serialize_render(self.current_displaying_render),
+                    active_at=time.time() - idle,
+                    state=state)
+
+    @staticmethod
+    def persistent_class(snapshot: dict):
+        return _persistent_classes.get(snapshot["cls"])
+
+    @staticmethod
+    async def rehydrate(bot, snapshot: dict) -> Optional["ReactiveMessage"]:
+        """rebinds a snapshotted message to the message it left in the channel instead of sending a new one"""
+        cls = ReactiveMessage.persistent_class(snapshot)
+        if cls is None:
+            return None
+
+        try:
+            channel = bot.get_channel(snapshot["channel_id"])
+            if channel is None:
+                channel = await bot.fetch_channel(snapshot["channel_id"])
+            message = await channel.fetch_message(snapshot["message_id"])
+        except discord.HTTPException:
+            return None
+
+        self = cls.__new__(cls)
+        self._setup(bot, channel)
+
+        self._bound_message = message
+        self._bound_uncached = True
+        self.reaction_state = ReactionState.from_reactions(message.reactions)
+
+        self.current_displaying_render = deserialize_render(snapshot["render"])
+        self.current_fingerprints = render_fingerprints(self.current_displaying_render)
+        self.message_render = self.current_displaying_render.copy()
+        self.functional = True
+
+        if not await self.restore_state(snapshot["state"]):
+            return None
+
+        self._rendered_version = self.state_version()
+        self._register()
+
+        return self
+
     async def send(self):
         message_kwargs = await discord.utils.maybe_coroutine(self.render_message)
         await self.send_from_dict(message_kwargs)
+        self._rendered_version = self.state_version() if self.functional else None
 
     # noinspection PyArgumentList
     async def wait_permissions_fulfill(self, changes: dict, send_first_attempt=False):
@@ -144,32 +300,24 @@ class ReactiveMessage(ABC):
 
             if len(s) == 0:
                 self.functional = True
-                await method(changes)
-                return
-            else:
-                await method(dict(content=format_permissions(s)))
-
-                def check_channel(channel):
-                    return channel.id == self.channel.id
-
-                def check_guild(guild):
-                    return guild.id == self.channel.guild.id
-
-                def check_user(user):
-                    return user.id == self.bot.user.id
 
-                pending_tasks = [
-                    self.bot.wait_for('guild_channel_update', check=lambda before, after: check_channel(after)),
-                    self.bot.wait_for('guild_role_update', check=lambda before, after: check_guild(after.guild)),
-                    self.bot.wait_for('member_update', check=lambda before, after: check_user(after))]
+                try:
+                    await method(changes)
+                except discord.Forbidden:
+                    self.functional = False
 
-                done_tasks, pending_tasks = await asyncio.wait(pending_tasks, return_when=asyncio.FIRST_COMPLETED,
-                                                               timeout=30)
+                    # the cache missed a change, checked again with the actual permissions
+                    if not self.bot.permission_watcher.refresh(self.channel):
+                        raise
+                    continue
 
-                for task in pending_tasks:
-                    task.cancel()
+                return
+            else:
+                await method(dict(content=format_permissions(s)))
 
-                if len(done_tasks) == 0:
+                try:
+                    await self.bot.permission_watcher.wait_change(self.channel, timeout=30)
+                except asyncio.TimeoutError:
                     await self.delete()
                     return
             send_first_attempt = False
@@ -186,6 +334,7 @@ class ReactiveMessage(ABC):
             to_delete = self.bound_message
 
         self.current_displaying_render = d.copy()
+        self.current_fingerprints = render_fingerprints(d)
         reactions = d.pop("reactions", None)
 
         self.bound_message = await self.channel.send(**_strip_only_message(d))
@@ -195,11 +344,53 @@ class ReactiveMessage(ABC):
             # the old message is called now because of the cog possibly removing this instance from this
 
         if reactions is not None:
-            await send_reactions(self.bound_message, reactions)
+            await send_reactions(self.bound_message, self.reaction_state, reactions)
+
+    async def request_update(self, immediate=False):
+        """marks the message as outdated, the update is deferred if another one happened recently"""
+        loop = asyncio.get_running_loop()
+        wait = self._last_update + self.UPDATE_INTERVAL - loop.time()
+
+        if immediate or wait <= 0:
+            await self.update()
+
+        elif self._update_pending:
+            self.updates_merged += 1
+
+        else:
+            self._update_pending = True
+            self._update_handle = loop.call_later(wait, self._deferred_update)
+
+    def _deferred_update(self):
+        self._update_handle = None
+        asyncio.ensure_future(self._run_deferred_update())
+
+    async def _run_deferred_update(self):
+        async with self.lock:
+            if self.running and self._update_pending:
+                await self.update()
+
+    def _cancel_pending_update(self):
+        self._update_pending = False
+        if self._update_handle is not None:
+            self._update_handle.cancel()
+            self._update_handle = None
 
     async def update(self):
+        # renders whatever the latest state is, so it also covers any deferred update
+        self._cancel_pending_update()
+        self._last_update = asyncio.get_running_loop().time()
+
+        version = self.state_version()
+        if version is not None and version == self._rendered_version:
+            self.renders_skipped += 1
+            return
+
+        self.updates_done += 1
+
         message_kwargs = await discord.utils.maybe_coroutine(self.render_message)
         await self.update_from_dict(message_kwargs)
+        self._rendered_version = self.state_version() if self.functional else None
 
     async def update_from_dict(self, d):
         await self.wait_permissions_fulfill(d, False)
@@ -207,9 +398,7 @@ class ReactiveMessage(ABC):
         self.message_render = d
 
     def check_permissions(self, perms):
-        guild = self.channel.guild
-        me = guild.me if guild is not None else self.bot.user
-        permissions = self.channel.permissions_for(me)
+        permissions = self.bot.permission_watcher.permissions_for(self.channel)
 
         return [perm for perm, value in perms.items() if getattr(permissions, perm) != value]
 
@@ -230,11 +419,10 @@ class ReactiveMessage(ABC):
         return permissions
 
     async def _update_from_dict(self, d: dict):
-        changes = process_render_changes(self.current_displaying_render, d)
+        new_fingerprints = render_fingerprints(d)
+        changes = process_render_changes(self.current_fingerprints, d, new_fingerprints)
 
-        guild = self.channel.guild
-        me = guild.me if guild is not None else self.bot.user
-        permissions = self.channel.permissions_for(me)
+        permissions = self.bot.permission_watcher.permissions_for(self.channel)
 
         reaction_re_sync_required = False  # true if updating reactions wasn't totally possible
 
@@ -253,32 +441,34 @@ class ReactiveMessage(ABC):
                 try:
                     if not reaction_group_changed and "reaction_group" in self.current_displaying_render:
                         if permissions.manage_messages and permissions.add_reactions:
-                            await sync_reactions(self.bound_message, new_reactions)
+                            await sync_reactions(self.bound_message, self.reaction_state, new_reactions)
                         elif permissions.add_reactions:
-                            await send_reactions(self.bound_message, new_reactions)
+                            await send_reactions(self.bound_message, self.reaction_state, new_reactions)
                             reaction_re_sync_required = True
                         else:
                             reaction_re_sync_required = True
                     else:
                         if permissions.manage_messages:
-                            await self.bound_message.clear_reactions()
+                            with self.reaction_state.request(None, CLEAR):
+                                await self.bound_message.clear_reactions()
                         else:
                             reaction_re_sync_required = True
 
                         if permissions.add_reactions:
-                            await send_reactions(self.bound_message, new_reactions)
+                            await send_reactions(self.bound_message, self.reaction_state, new_reactions)
                         else:
                             reaction_re_sync_required = True
 
                 except discord.Forbidden:
+                    self.bot.permission_watcher.refresh(self.channel)
                     reaction_re_sync_required = True
 
         if reaction_re_sync_required:
-            message = await self.channel.fetch_message(self.bound_message.id)
-
-            d["reactions"] = [reaction.emoji for reaction in message.reactions]
+            d["reactions"] = self.reaction_state.emojis()
+            new_fingerprints["reactions"] = fingerprint(d["reactions"])
 
         self.current_displaying_render = d
+        self.current_fingerprints = new_fingerprints
 
     async def process_reaction_add(self, reaction, user):
         """this event is limited to the bound message"""
@@ -291,7 +481,13 @@ class ReactiveMessage(ABC):
     @checks_updates
     async def on_message(self, message):
         if self.functional and message.channel.id == self.channel.id and self.bot.user.id != message.author.id:
-            return await self.process_message(message)
+            handled = await self.process_message(message)
+
+            # the chatter of the channel doesn't keep it alive, only the messages it acted on
+            if handled:
+                self.bot.reactive_lifecycle.touch(self)
+
+            return handled
 
     @checks_updates
     async def on_reaction_add(self, reaction, user):
@@ -299,8 +495,61 @@ class ReactiveMessage(ABC):
             return
 
         if self.functional and self.bound_message.id == reaction.message.id and self.bot.user.id != user.id:
+            self.bot.reactive_lifecycle.touch(self)
             return await self.process_reaction_add(reaction, user)
 
+    def _is_bound_payload(self, payload):
+        return self.bound_message is not None and payload.message_id == self.bound_message.id
+
+    async def on_raw_reaction_add(self, payload):
+        if self._is_bound_payload(payload):
+            is_me = payload.user_id == self.bot.user.id
+            self.reaction_state.add(payload.emoji, is_me)
+
+            if self._bound_uncached and not is_me:
+                await self._uncached_reaction_add(payload)
+
+    async def replay(self, event_name, args):
+        """
+        an event received while the message was being rehydrated
+        the fetched reactions already count the raw reaction events, only what they trigger is run
+        """
+        if event_name == "raw_reaction_add":
+            payload = args[0]
+            if self._is_bound_payload(payload) and payload.user_id != self.bot.user.id:
+                await self._uncached_reaction_add(payload)
+
+        elif event_name not in RAW_REACTION_EVENTS:
+            self.bot.reactive_router.dispatch(event_name, *args)
+
+    async def _uncached_reaction_add(self, payload):
+        # reaction_add is only dispatched for cached messages, a rehydrated message builds it from the raw event
+        user = payload.member or self.bot.get_user(payload.user_id)
+        if user is None:
+            with suppress(discord.HTTPException):
+                user = await self.bot.fetch_user(payload.user_id)
+            if user is None:
+                return
+
+        # noinspection PyProtectedMember
+        emoji = self.bot._connection._upgrade_partial_emoji(payload.emoji)
+        reaction = discord.Reaction(message=self.bound_message, emoji=emoji,
+                                    data=dict(me=str(emoji) in self.reaction_state.mine()))
+
+        await self.on_reaction_add(reaction, user)
+
+    async def on_raw_reaction_remove(self, payload):
+        if self._is_bound_payload(payload):
+            self.reaction_state.remove(payload.emoji, payload.user_id == self.bot.user.id)
+
+    async def on_raw_reaction_clear(self, payload):
+        if self._is_bound_payload(payload):
+            self.reaction_state.clear()
+
+    async def on_raw_reaction_clear_emoji(self, payload):
+        if self._is_bound_payload(payload):
+            self.reaction_state.clear_emoji(payload.emoji)
+
     async def on_message_delete(self, message):
         if self.bound_message is None:
             return
@@ -315,11 +564,54 @@ class ReactiveMessage(ABC):
         if self.bound_message in messages:
             await self.remove()
 
+    async def on_raw_message_delete(self, payload):
+        # message_delete is only dispatched for cached messages
+        if self._bound_uncached and self._is_bound_payload(payload):
+            await self.remove()
+
+    async def on_raw_bulk_message_delete(self, payload):
+        if self._bound_uncached and self.bound_message is not None and self.bound_message.id in payload.message_ids:
+            await self.remove()
+
+    def _detach(self):
+        """stops the events from reaching the message, what it holds is left as it is"""
+        self._cancel_pending_update()
+        self.bot.reactive_router.remove(self)
+        self.bot.reactive_lifecycle.discard(self)
+
+        self.running = False
+
     async def remove(self):
+        """stops listening for good, subclasses release what they hold here"""
+        if self.running or self.frozen:
+            self._detach()
+            self.frozen = False
+
+    async def freeze(self):
+        """
+        stops listening to anything, the last render stays in the channel and the state is kept
+        the next event for the bound message thaws it, see ReactiveMessageRouter.freeze
+        """
         if self.running:
-            self.bot.remove_listener_object(self)
-
-            self.running = False
+            async with self.lock:
+                thawable = self.bot.reactive_router.thawable(self)
+                self._active_at = time.time() - self.bot.reactive_lifecycle.idle_for(self)
+                self._detach()
+
+                if thawable:
+                    self.frozen = True
+                    self.bot.reactive_router.freeze(self)
+
+            if not self.frozen:
+                # nothing would thaw it
+                await self.remove()
+
+    def thaw(self):
+        """listens again after a freeze, with the state it had"""
+        if self.frozen:
+            self.frozen = False
+            self.running = True
+            self._register()
 
     async def delete(self):
         if self.running:
@@ -0,0 +1,168 @@
+import asyncio
+from collections import defaultdict, OrderedDict
+from typing import Dict, Set, Iterable
+
+
+RAW_REACTION_EVENTS = ("raw_reaction_add", "raw_reaction_remove", "raw_reaction_clear", "raw_reaction_clear_emoji")
+RAW_DELETE_EVENTS = ("raw_message_delete", "raw_bulk_message_delete")
+
+
+def _message_ids(event_name, args):
+    if event_name in RAW_REACTION_EVENTS:
+        return args[0].message_id,
+
+    elif event_name == "reaction_add":
+        return args[0].message.id,
+
+    elif event_name == "message_delete":
+        return args[0].id,
+
+    elif event_name == "bulk_message_delete":
+        return [message.id for message in args[0]]
+
+    elif event_name == "raw_message_delete":
+        return args[0].message_id,
+
+    elif event_name == "raw_bulk_message_delete":
+        return tuple(args[0].message_ids)
+
+    return ()
+
+
+class ReactiveMessageRouter:
+    """
+    indexes the live reactive messages so each event only reaches the ones it's pertinent to
+    frozen ones are set aside until an event for their bound message thaws them
+    """
+
+    # events routed by the channel the reactive message lives in
+    CHANNEL_EVENTS = ("message",)
+
+    # events routed by the message the reactive message is bound to
+    MESSAGE_EVENTS = ("reaction_add", "message_delete", "bulk_message_delete", *RAW_REACTION_EVENTS, *RAW_DELETE_EVENTS)
+
+    # frozen messages kept to be thawed, the oldest ones past it are removed for good
+    FROZEN_CAP = 1000
+
+    def __init__(self, bot):
+        self.bot = bot
+
+        self._live: Set = set()
+        self._by_message: Dict[int, object] = {}
+        self._by_channel: Dict[int, Set] = defaultdict(set)
+        self._by_event: Dict[str, Set] = defaultdict(set)  # other events, by explicit subscription
+        self._subscriptions: Dict[object, tuple] = {}
+        self._frozen: OrderedDict = OrderedDict()  # bound message id -> frozen reactive message, oldest first
+
+    def add(self, reactive_message):
+        self._live.add(reactive_message)
+        self._by_channel[reactive_message.channel.id].add(reactive_message)
+
+        if reactive_message.bound_message is not None:
+            self._by_message[reactive_message.bound_message.id] = reactive_message
+
+    def remove(self, reactive_message):
+        self._forget_frozen(reactive_message)
+
+        if reactive_message not in self._live:
+            return
+
+        self._live.remove(reactive_message)
+        self.subscribe(reactive_message, ())
+
+        channel_id = reactive_message.channel.id
+        in_channel = self._by_channel[channel_id]
+        in_channel.discard(reactive_message)
+        if len(in_channel) == 0:
+            del self._by_channel[channel_id]
+
+        if reactive_message.bound_message is not None:
+            self._unbind(reactive_message, reactive_message.bound_message)
+
+    def thawable(self, reactive_message) -> bool:
+        """
+        whether the next event for its bound message would thaw the message if it was frozen
+        the events it subscribed to don't go through the bound message, it would wait on them forever
+        """
+        return reactive_message.bound_message is not None and reactive_message not in self._subscriptions
+
+    def freeze(self, reactive_message):
+        """keeps a detached message so the next event for its bound message thaws it"""
+        self._frozen[reactive_message.bound_message.id] = reactive_message
+
+        while len(self._frozen) > self.FROZEN_CAP:
+            _, oldest = self._frozen.popitem(last=False)
+            asyncio.ensure_future(oldest.remove())
+
+    def frozen(self):
+        return tuple(self._frozen.values())
+
+    def _forget_frozen(self, reactive_message):
+        bound = reactive_message.bound_message
+        if bound is not None and self._frozen.get(bound.id) is reactive_message:
+            del self._frozen[bound.id]
+
+    def _thaw(self, event_name, args):
+        for message_id in _message_ids(event_name, args):
+            frozen = self._frozen.pop(message_id, None)
+            if frozen is not None:
+                frozen.thaw()
+
+    def subscribe(self, reactive_message, events):
+        """replaces the events the reactive message receives through on_event"""
+        for event_name in self._subscriptions.pop(reactive_message, ()):
+            subscribed = self._by_event[event_name]
+            subscribed.discard(reactive_message)
+            if len(subscribed) == 0:
+                del self._by_event[event_name]
+
+        events = tuple(events)
+        if len(events) == 0 or reactive_message not in self._live:
+            return
+
+        self._subscriptions[reactive_message] = events
+        for event_name in events:
+            self._by_event[event_name].add(reactive_message)
+
+    def rebind(self, reactive_message, old, new):
+        """called when the bound message of a reactive message changes"""
+        if old is not None:
+            self._unbind(reactive_message, old)
+
+        if new is not None and reactive_message in self._live:
+            self._by_message[new.id] = reactive_message
+
+    def _unbind(self, reactive_message, message):
+        if self._by_message.get(message.id) is reactive_message:
+            del self._by_message[message.id]
+
+    def targets(self, event_name, args) -> Iterable:
+        if event_name in self.CHANNEL_EVENTS:
+            return tuple(self._by_channel.get(args[0].channel.id, ()))
+
+        if event_name in self.MESSAGE_EVENTS:
+            ret = []
+            for message_id in _message_ids(event_name, args):
+                target = self._by_message.get(message_id)
+                if target is not None:
+                    ret.append(target)
+            return ret
+
+        return ()
+
+    def dispatch(self, event_name, *args, **kwargs):
+        if len(self._frozen) > 0 and event_name in self.MESSAGE_EVENTS:
+            self._thaw(event_name, args)
+
+        for target in self.targets(event_name, args):
+            method = f"on_{event_name}"
+            self.bot._schedule_event(getattr(target, method), method, *args, **kwargs)
+
+        for target in tuple(self._by_event.get(event_name, ())):
+            self.bot._schedule_event(target.on_event, "on_event", event_name, *args, **kwargs)
+
+    def __iter__(self):
+        return iter(tuple(self._live))
+
+    def __len__(self):
+        return len(self._live)
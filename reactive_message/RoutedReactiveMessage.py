@@ -2,7 +2,8 @@ from __future__ import annotations
 
 import asyncio
 from abc import ABC, abstractmethod
-from typing import Dict, Any, Union, Tuple, Type
+from functools import lru_cache
+from typing import Dict, Any, Union, Tuple, Type, Optional
 
 from reactive_message.ReactiveMessage import ReactiveMessage, checks_updates
 
@@ -16,6 +17,16 @@ def chain(func):
 
 
 class Page(ABC):
+    # gateway events the page has on_<event> handlers for, the message only receives these while in this page
+    EVENTS: Tuple[str, ...] = ()
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+
+        for event_name in cls.EVENTS:
+            if not callable(getattr(cls, f"on_{event_name}", None)):
+                raise RuntimeError(f"{cls.__name__} subscribes to {event_name} but has no on_{event_name}")
+
     def __init__(self, message, args: Dict[str, str]):
         self.message = message
         self.args = args
@@ -26,6 +37,10 @@ class Page(ABC):
     def render_message(self) -> Dict[str, Any]:
         raise NotImplementedError
 
+    def state_version(self):
+        """see ReactiveMessage.state_version"""
+        return None
+
     async def process_reaction_add(self, reaction, user):
         pass
 
@@ -70,66 +85,160 @@ class Route:
         self.base_page = page
 
 
+class CompiledRoute:
+    """a node of the route trie, built once per RoutedReactiveMessage class"""
+    __slots__ = ("static", "fallback_var", "fallback", "vararg_var", "vararg", "base_page")
+
+    def __init__(self, static, fallback_var, fallback, vararg_var, vararg, base_page):
+        self.static: Dict[str, Union[CompiledRoute, Type[Page]]] = static
+        self.fallback_var = fallback_var
+        self.fallback: Union[CompiledRoute, Type[Page], None] = fallback
+        self.vararg_var = vararg_var
+        self.vararg: Optional[Type[Page]] = vararg
+        self.base_page: Optional[Type[Page]] = base_page
+
+
+def _compile_target(target, path, visiting):
+    if isinstance(target, Route):
+        return compile_route(target, path, visiting)
+
+    if isinstance(target, type) and issubclass(target, Page):
+        return target
+
+    raise RuntimeError(f"Route {path or '<root>'} points to {target!r}, which is neither a route nor a page")
+
+
+def compile_route(route: Route, path="", visiting=None) -> CompiledRoute:
+    """turns a Route tree into a trie, raising on the routes that could never be reached or are ambiguous"""
+    if visiting is None:
+        visiting = set()
+
+    if id(route) in visiting:
+        raise RuntimeError(f"Route {path or '<root>'} contains itself")
+
+    visiting = visiting | {id(route)}
+
+    static = {}
+    for name, target in route.routes.items():
+        if name == "" or "." in name:
+            raise RuntimeError(f"Route name {name!r} in {path or '<root>'} can never be matched")
+
+        static[name] = _compile_target(target, f"{path}.{name}" if path else name, visiting)
+
+    if route.fallback is not None and route.vararg is not None:
+        raise RuntimeError(f"Route {path or '<root>'} has both a fallback and a vararg, the vararg is unreachable")
+
+    fallback = None
+    if route.fallback is not None:
+        fallback = _compile_target(route.fallback, f"{path}.<{route.fallback_var}>", visiting)
+
+    vararg = None
+    if route.vararg is not None:
+        vararg = _compile_target(route.vararg, f"{path}.<{route.vararg_var}...>", visiting)
+        if not isinstance(vararg, type):
+            raise RuntimeError(f"The vararg of {path or '<root>'} must be a page")
+
+    if len(static) == 0 and fallback is None and vararg is None and route.base_page is None:
+        raise RuntimeError(f"Route {path or '<root>'} leads nowhere")
+
+    return CompiledRoute(static, route.fallback_var, fallback, route.vararg_var, vararg, route.base_page)
+
+
+def resolve_route(root: CompiledRoute, route: str) -> Optional[Tuple[Type[Page], Tuple[Tuple[str, str], ...]]]:
+    """returns the page and the args of the route, None if the route is invalid"""
+    particles = route.split(".") if route != "" else []
+    current = root
+    args = []
+
+    for idx, particle in enumerate(particles):
+        if not isinstance(current, CompiledRoute):
+            # there's still particles but a page was already reached
+            return None
+
+        target = current.static.get(particle)
+
+        if target is not None:
+            current = target
+
+        elif current.fallback is not None:
+            args.append((current.fallback_var, particle))
+            current = current.fallback
+
+        elif current.vararg is not None:
+            args.append((current.vararg_var, ".".join(particles[idx:])))
+            current = current.vararg
+            break
+
+        else:
+            return None
+
+    if isinstance(current, CompiledRoute):
+        if current.base_page is None:
+            return None
+        current = current.base_page
+
+    return current, tuple(args)
+
+
 class RoutedReactiveMessage(ReactiveMessage):
     ROUTE = None
     ERROR_PAGE = None
 
-    def __init__(self, cog, channel):
-        super().__init__(cog, channel)
-
+    def _setup(self, bot, channel):
         if type(self).ROUTE is None:
             raise RuntimeError("Route is unfilled")
 
+        super(RoutedReactiveMessage, self)._setup(bot, channel)
+
         self.route = ""
         self._current_route = None
         self._current_page = None
         self._current_args = None
 
+    def _register(self):
+        super(RoutedReactiveMessage, self)._register()
+
+        if self._current_page is not None:
+            # a rehydrated message enters its page before being registered
+            self.bot.reactive_router.subscribe(self, type(self._current_page).EVENTS)
+
+    def snapshot_state(self) -> Optional[dict]:
+        return dict(route=self.route)
+
+    async def restore_state(self, state: dict) -> bool:
+        self.route = state["route"]
+
+        if self._resolve_route(self.route) is None and self.ERROR_PAGE is None:
+            return False
+
+        await self.change_page()
+        return True
+
+    ROUTE_CACHE_SIZE = 256
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+
+        if "ROUTE" in vars(cls) and cls.ROUTE is not None:
+            # routes are compiled (and validated) when the class is created
+            cls._compiled_route = compile_route(cls.ROUTE)
+            cls._resolve_route = staticmethod(lru_cache(maxsize=cls.ROUTE_CACHE_SIZE)(
+                lambda route, root=cls._compiled_route: resolve_route(root, route)))
+
     def get_page(self) -> Tuple[Type[Page], dict]:
         if self.route == self._current_route:
             # route did not change
             return type(self._current_page), self._current_args
 
-        particles = self.route.split(".")
-        current = self.ROUTE
-        args = {}
-
-        for idx, particle in enumerate(particles):
-            if isinstance(current, Route):
-                for route_name, route in current.routes.items():
-                    if particle == route_name:
-                        current = route
-                        break
-
-                else:
-                    if current.fallback_var is not None:
-                        args[current.fallback_var] = particle
-                        current = current.fallback
-                        continue
-
-                    if current.vararg is not None:
-                        args[current.vararg_var] = ".".join(particles[idx:])
-                        current = current.vararg
-                        break
-            else:
-                if self.ERROR_PAGE is None:
-                    raise RuntimeError("Route is invalid")
-                else:
-                    current = self.ERROR_PAGE
-
-                return current, args
-
-        if isinstance(current, Route):
-            if current.base_page is None:
-                if self.ERROR_PAGE is None:
-                    raise RuntimeError("Route is invalid")
-                else:
-                    current = self.ERROR_PAGE
-
-            else:
-                current = current.base_page
-
-        return current, args
+        resolved = self._resolve_route(self.route)
+
+        if resolved is None:
+            if self.ERROR_PAGE is None:
+                raise RuntimeError("Route is invalid")
+            return self.ERROR_PAGE, {}
+
+        page, args = resolved
+        return page, dict(args)
 
     async def change_page(self):
         route_page, route_args = self.get_page()
@@ -146,12 +255,24 @@ class RoutedReactiveMessage(ReactiveMessage):
             from_page = type(self._current_page)
 
             self._current_page = route_page(self, route_args)
+            self.bot.reactive_router.subscribe(self, route_page.EVENTS)
 
             await self._current_page.on_enter(from_page)
 
         self._current_route = self.route
         self._current_args = route_args
 
+    def state_version(self):
+        if self._current_page is None or self.route != self._current_route:
+            # the page is going to change
+            return None
+
+        page_version = self._current_page.state_version()
+        if page_version is None:
+            return None
+
+        return self.route, page_version
+
     async def render_message(self) -> Dict[str, Any]:
         await self.change_page()
 
@@ -169,6 +290,12 @@ class RoutedReactiveMessage(ReactiveMessage):
 
     @checks_updates
     async def on_event(self, event_name, *args, **kwargs):
-        method = f"on_{event_name}"
-        if hasattr(self._current_page, method) and callable(getattr(self._current_page, method)):
-            return await getattr(self._current_page, method)(*args, **kwargs)
+        """receives the events the current page subscribed to, see Page.EVENTS"""
+        if event_name in self._current_page.EVENTS:
+            handled = await getattr(self._current_page, f"on_{event_name}")(*args, **kwargs)
+
+            # subscribed events are broadcast, only the ones the page acted on count as activity
+            if handled:
+                self.bot.reactive_lifecycle.touch(self)
+
+            return handled
@@ -0,0 +1,134 @@
+import asyncio
+import json
+import logging
+import os
+import time
+from typing import Dict, Optional, Tuple, List
+
+from reactive_message.ReactiveMessage import ReactiveMessage
+from reactive_message.ReactiveMessageRouter import ReactiveMessageRouter, _message_ids, RAW_DELETE_EVENTS
+
+logger = logging.getLogger(__name__)
+
+
+class SnapshotStore:
+    """
+    keeps the persistent reactive messages across restarts
+    after loading, the snapshots stay dormant until the first event for their message, then they are rehydrated
+    """
+
+    SAVE_INTERVAL = 5 * 60
+
+    # a snapshot whose rehydration keeps failing is given up after this many tries
+    WAKE_ATTEMPTS = 3
+
+    def __init__(self, bot, path):
+        self.bot = bot
+        self.path = path
+
+        self._dormant: Dict[int, dict] = {}  # by message id
+        self._waking: Dict[int, Tuple[dict, List]] = {}  # snapshot and the events received while rehydrating
+        self._save_task: Optional[asyncio.Task] = None
+        self._failed_wakes: Dict[int, int] = {}  # by message id
+
+    def load(self):
+        try:
+            with open(self.path) as f:
+                snapshots = json.load(f)
+        except (FileNotFoundError, ValueError):
+            return
+
+        now = time.time()
+
+        for snapshot in snapshots:
+            cls = ReactiveMessage.persistent_class(snapshot)
+            if cls is None:
+                continue
+
+            if cls.IDLE_TIMEOUT is not None and now - snapshot["active_at"] >= cls.IDLE_TIMEOUT:
+                # it would have been frozen by now anyway
+                continue
+
+            self._dormant[snapshot["message_id"]] = snapshot
+
+    def save(self):
+        reactive_messages = (*self.bot.reactive_router, *self.bot.reactive_router.frozen())
+        snapshots = [reactive_message.snapshot() for reactive_message in reactive_messages]
+        snapshots = [snapshot for snapshot in snapshots if snapshot is not None]
+
+        snapshots.extend(self._dormant.values())
+        snapshots.extend(snapshot for snapshot, _ in self._waking.values())
+
+        # written to a temporary file first so a crash mid write doesn't lose the previous snapshots
+        temporary = f"{self.path}.tmp"
+        with open(temporary, "w") as f:
+            json.dump(snapshots, f)
+        os.replace(temporary, self.path)
+
+    def start(self):
+        if self._save_task is None:
+            self._save_task = asyncio.ensure_future(self._save_periodically())
+
+    async def _save_periodically(self):
+        while True:
+            await asyncio.sleep(self.SAVE_INTERVAL)
+            self.save()
+
+    def close(self):
+        if self._save_task is not None:
+            self._save_task.cancel()
+            self._save_task = None
+
+        self.save()
+
+    def dispatch(self, event_name, *args):
+        if (len(self._dormant) == 0 and len(self._waking) == 0) or \
+                event_name not in ReactiveMessageRouter.MESSAGE_EVENTS:
+            return
+
+        for message_id in _message_ids(event_name, args):
+            waking = self._waking.get(message_id)
+            if waking is not None:
+                waking[1].append((event_name, args))
+                continue
+
+            snapshot = self._dormant.pop(message_id, None)
+            if snapshot is None or event_name in RAW_DELETE_EVENTS:
+                continue
+
+            self._waking[message_id] = (snapshot, [(event_name, args)])
+            asyncio.ensure_future(self._wake(message_id))
+
+    async def _wake(self, message_id):
+        snapshot, _ = self._waking[message_id]
+
+        try:
+            reactive_message = await ReactiveMessage.rehydrate(self.bot, snapshot)
+        except asyncio.CancelledError:
+            self._waking.pop(message_id)
+            self._dormant[message_id] = snapshot
+            raise
+        except Exception:
+            _, events = self._waking.pop(message_id)
+
+            attempts = self._failed_wakes.get(message_id, 0) + 1
+            logger.exception("couldn't rehydrate the reactive message %s (attempt %s)", message_id, attempts)
+
+            if attempts < self.WAKE_ATTEMPTS:
+                # dormant again, the next event for the message tries once more
+                self._failed_wakes[message_id] = attempts
+                self._dormant[message_id] = snapshot
+            else:
+                self._failed_wakes.pop(message_id, None)
+            return
+
+        _, events = self._waking.pop(message_id)
+        self._failed_wakes.pop(message_id, None)
+
+        if reactive_message is not None:
+            # the router had nothing to send these to while it was rehydrating
+            for event_name, args in events:
+                await reactive_message.replay(event_name, args)
+
+    def __len__(self):
+        return len(self._dormant)
@@ -0,0 +1,86 @@
+import asyncio
+import marshal
+
+from games.CheckpointLog import CheckpointLog, HEADER
+
+
+def run(coroutine):
+    return asyncio.new_event_loop().run_until_complete(coroutine)
+
+
+def read_records(path):
+    with open(path, "rb") as f:
+        data = f.read()
+
+    records = []
+    offset = 0
+    while offset < len(data):
+        length, = HEADER.unpack_from(data, offset)
+        offset += HEADER.size
+        records.append(marshal.loads(data[offset:offset + length]))
+        offset += length
+
+    return records
+
+
+def test_records_are_length_prefixed(tmp_path):
+    path = str(tmp_path / "log")
+    log = CheckpointLog(None, path)
+    log._append([marshal.dumps(("a", {"turn": 1})), marshal.dumps(("b", None))])
+
+    assert read_records(path) == [("a", {"turn": 1}), ("b", None)]
+
+
+def test_load_keeps_the_latest_states_and_drops_the_ended(tmp_path):
+    path = str(tmp_path / "log")
+    log = CheckpointLog(None, path)
+    log._append([marshal.dumps(("a", {"turn": 1})),
+                 marshal.dumps(("b", {"turn": 1})),
+                 marshal.dumps(("a", {"turn": 2})),
+                 marshal.dumps(("b", None))])
+
+    assert CheckpointLog(None, path).load() == [("a", {"turn": 2})]
+    # load compacts the log to what it returned
+    assert read_records(path) == [("a", {"turn": 2})]
+
+
+def test_load_recovers_from_a_torn_tail(tmp_path):
+    path = str(tmp_path / "log")
+    CheckpointLog(None, path)._append([marshal.dumps(("a", {"turn": 1}))])
+
+    torn = HEADER.pack(100) + marshal.dumps(("a", {"turn": 2}))[:5]
+    with open(path, "ab") as f:
+        f.write(torn)
+
+    assert CheckpointLog(None, path).load() == [("a", {"turn": 1})]
+
+
+def test_flush_compacts_past_the_size(tmp_path):
+    async def scenario():
+        path = str(tmp_path / "log")
+        log = CheckpointLog(asyncio.get_running_loop(), path)
+        log.FLUSH_DELAY = 0
+        log.COMPACT_SIZE = 0
+
+        for turn in range(3):
+            log.record("a", {"turn": turn})
+            await asyncio.sleep(0.05)
+
+        assert read_records(path) == [("a", {"turn": 2})]
+        log.close()
+
+    run(scenario())
+
+
+def test_a_rewrite_queued_before_close_is_skipped(tmp_path):
+    path = str(tmp_path / "log")
+    log = CheckpointLog(None, path)
+    log._latest = {"a": marshal.dumps(("a", {"turn": 1}))}
+    stale = list(log._latest.values())
+
+    log._latest = {"a": marshal.dumps(("a", {"turn": 2}))}
+    log.close()
+
+    assert log._rewrite(stale) == 0
+    assert log._append(stale) == 0
+    assert read_records(path) == [("a", {"turn": 2})]
@@ -0,0 +1,88 @@
+import asyncio
+
+import pytest
+
+from util.eager_gather import eager_gather
+
+
+def run(coroutine):
+    return asyncio.new_event_loop().run_until_complete(coroutine)
+
+
+async def immediate(value, log):
+    log.append(value)
+    return value
+
+
+async def suspended(value, log):
+    await asyncio.sleep(0)
+    log.append(value)
+    return value
+
+
+def test_results_keep_the_order_of_the_coroutines():
+    async def scenario():
+        log = []
+        results = await eager_gather(suspended(1, log), immediate(2, log), suspended(3, log))
+
+        assert results == [1, 2, 3]
+        # the one that didn't suspend ran before the others resumed
+        assert log == [2, 1, 3]
+
+    run(scenario())
+
+
+def test_coroutines_that_finish_right_away_need_no_task():
+    async def scenario():
+        before = len(asyncio.all_tasks())
+        log = []
+        coroutine = eager_gather(immediate(1, log), immediate(2, log))
+
+        # stepped by hand, the gather finishes without ever yielding to the loop
+        with pytest.raises(StopIteration) as stop:
+            coroutine.send(None)
+
+        assert stop.value.value == [1, 2]
+        assert len(asyncio.all_tasks()) == before
+
+    run(scenario())
+
+
+def test_the_first_exception_is_raised_once_everything_ran():
+    async def failing(log):
+        await asyncio.sleep(0)
+        raise ValueError
+
+    async def scenario():
+        log = []
+
+        with pytest.raises(ValueError):
+            await eager_gather(failing(log), suspended(1, log))
+
+        assert log == [1]
+
+    run(scenario())
+
+
+def test_cancelling_reaches_the_suspended_coroutines():
+    async def scenario():
+        cancelled = []
+
+        async def waiting():
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled.append(True)
+                raise
+
+        task = asyncio.ensure_future(eager_gather(waiting()))
+        await asyncio.sleep(0)
+        task.cancel()
+
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+        await asyncio.sleep(0)
+        assert cancelled == [True]
+
+    run(scenario())
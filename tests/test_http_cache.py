@@ -0,0 +1,50 @@
+import asyncio
+
+from util.http_cache import HttpCache
+
+
+class FakeResponse:
+    def __init__(self, body, etag=None):
+        self.body = body
+        self.status = 200
+        self.headers = {"Content-Type": "text/plain", "ETag": etag}
+
+
+def run(coroutine):
+    return asyncio.new_event_loop().run_until_complete(coroutine)
+
+
+def test_identical_restore_keeps_the_object(tmp_path):
+    async def scenario():
+        cache = HttpCache(str(tmp_path))
+        await cache.store("http://a/x", FakeResponse(b"body", '"1"'))
+        await cache.store("http://a/x", FakeResponse(b"body", '"2"'))
+
+        entry = cache.get("http://a/x")
+        assert entry.etag == '"2"'
+        assert await cache.read(entry) == b"body"
+        assert cache.size == 4
+        cache.close()
+
+    run(scenario())
+
+
+def test_changed_body_releases_the_old_object(tmp_path):
+    async def scenario():
+        cache = HttpCache(str(tmp_path))
+        await cache.store("http://a/x", FakeResponse(b"old"))
+        old = cache.get("http://a/x")
+        await cache.store("http://a/y", FakeResponse(b"old"))
+        await cache.store("http://a/x", FakeResponse(b"new"))
+
+        # still used by y
+        assert await cache.read(old) == b"old"
+        assert await cache.read(cache.get("http://a/x")) == b"new"
+        assert cache.size == 6
+
+        await cache.store("http://a/y", FakeResponse(b"new"))
+        assert await cache.read(old) is None
+        assert cache.size == 3
+        cache.close()
+
+    run(scenario())
@@ -0,0 +1,76 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from util.keyed_waiters import KeyedWaiters
+
+
+def run(coroutine):
+    return asyncio.new_event_loop().run_until_complete(coroutine)
+
+
+def test_only_the_waiters_of_the_key_are_resolved():
+    async def scenario():
+        waiters = KeyedWaiters()
+        first = asyncio.ensure_future(waiters.wait("raw_reaction_add", 1))
+        second = asyncio.ensure_future(waiters.wait("raw_reaction_add", 2))
+        await asyncio.sleep(0)
+
+        event = SimpleNamespace(message_id=1)
+        waiters.dispatch("raw_reaction_add", event)
+
+        assert await first is event
+        assert not second.done()
+        assert len(waiters) == 1
+
+        second.cancel()
+        await asyncio.sleep(0)
+        assert len(waiters) == 0
+
+    run(scenario())
+
+
+def test_the_check_filters_within_a_key():
+    async def scenario():
+        waiters = KeyedWaiters()
+        author = SimpleNamespace(id=5)
+        channel = SimpleNamespace(id=7)
+        waiting = asyncio.ensure_future(waiters.wait("message", (7, 5), check=lambda m: m.content == "yes"))
+        await asyncio.sleep(0)
+
+        waiters.dispatch("message", SimpleNamespace(channel=channel, author=author, content="no"))
+        assert not waiting.done()
+
+        answer = SimpleNamespace(channel=channel, author=author, content="yes")
+        waiters.dispatch("message", answer)
+        assert await waiting is answer
+
+    run(scenario())
+
+
+def test_two_argument_events_resolve_to_a_tuple():
+    async def scenario():
+        waiters = KeyedWaiters()
+        waiting = asyncio.ensure_future(waiters.wait("guild_channel_update", 3))
+        await asyncio.sleep(0)
+
+        before, after = SimpleNamespace(id=3), SimpleNamespace(id=3)
+        waiters.dispatch("guild_channel_update", before, after)
+        assert await waiting == (before, after)
+
+    run(scenario())
+
+
+def test_timeout_and_unknown_events():
+    async def scenario():
+        waiters = KeyedWaiters()
+
+        with pytest.raises(asyncio.TimeoutError):
+            await waiters.wait("raw_reaction_add", 1, timeout=0.01)
+        assert len(waiters) == 0
+
+        with pytest.raises(ValueError):
+            waiters.wait("typing", 1)
+
+    run(scenario())
@@ -0,0 +1,51 @@
+import asyncio
+
+from games.Mailbox import Mailbox
+
+
+async def noop(name):
+    return name
+
+
+def run(coroutine):
+    return asyncio.new_event_loop().run_until_complete(coroutine)
+
+
+def names(envelopes):
+    return [envelope.coroutine.cr_frame.f_locals["name"] for envelope in envelopes]
+
+
+def test_collapsed_envelope_goes_to_the_tail():
+    async def scenario():
+        mailbox = Mailbox(asyncio.get_running_loop(), 8)
+        first = mailbox.put(noop("answer 1"), collapse_key=("response", 1))
+        mailbox.put(noop("close round"))
+        mailbox.put(noop("answer 2"), collapse_key=("response", 1))
+
+        assert await first is None
+        assert mailbox.collapsed == 1
+
+        envelopes = mailbox.take(8)
+        assert names(envelopes) == ["close round", "answer 2"]
+
+        for envelope in envelopes:
+            envelope.coroutine.close()
+
+    run(scenario())
+
+
+def test_distinct_keys_keep_their_order():
+    async def scenario():
+        mailbox = Mailbox(asyncio.get_running_loop(), 8)
+        mailbox.put(noop("a"), collapse_key="a")
+        mailbox.put(noop("b"))
+        mailbox.put(noop("c"), collapse_key="c")
+
+        envelopes = mailbox.take(2)
+        assert names(envelopes) == ["a", "b"]
+        assert len(mailbox) == 1
+
+        for envelope in envelopes + mailbox.take(8):
+            envelope.coroutine.close()
+
+    run(scenario())
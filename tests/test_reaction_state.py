@@ -0,0 +1,68 @@
+import pytest
+
+from reactive_message.ReactionState import ReactionState, reaction_edit_script, ADD, CLEAR
+
+
+def test_edit_script_identical():
+    assert reaction_edit_script(["a", "b"], ["a", "b"], ["a", "b"]) == ([], [])
+
+
+def test_edit_script_readds_what_is_not_mine():
+    assert reaction_edit_script(["a", "b"], ["a"], ["a", "b"]) == ([], ["b"])
+
+
+def test_edit_script_prefix():
+    # the kept reactions are a prefix of the desired ones, the rest is appended
+    assert reaction_edit_script(["a", "b"], ["a", "b"], ["a", "b", "c"]) == ([], ["c"])
+    assert reaction_edit_script(["a", "b", "c"], ["a", "b", "c"], ["a", "b"]) == (["c"], [])
+
+
+def test_edit_script_reordering():
+    # b can't be moved before a, everything after the kept prefix is rebuilt
+    assert reaction_edit_script(["a", "b"], ["a", "b"], ["b", "a"]) == (["a"], ["a"])
+    assert reaction_edit_script(["a", "b", "c"], ["a", "b", "c"], ["a", "c", "b"]) == (["b"], ["b"])
+
+
+def test_edit_script_empty():
+    assert reaction_edit_script(["a", "b"], ["a", "b"], []) == (["a", "b"], [])
+    assert reaction_edit_script([], [], ["a", "b"]) == ([], ["a", "b"])
+
+
+def test_late_clear_after_a_local_add_is_skipped():
+    state = ReactionState()
+    state.add("a", True)
+
+    with state.request("a", CLEAR):
+        pass
+    with state.request("a", ADD):
+        pass
+
+    # the gateway events of the two requests arrive after both were applied
+    state.clear_emoji("a")
+    state.add("a", True)
+
+    assert state.mine() == ["a"]
+
+
+def test_clear_by_someone_else_still_applies():
+    state = ReactionState()
+
+    with state.request("a", ADD):
+        pass
+    state.add("a", True)
+
+    state.clear_emoji("a")
+    assert state.emojis() == []
+
+
+def test_failed_request_expects_nothing():
+    state = ReactionState()
+    state.add("a", True)
+
+    with pytest.raises(RuntimeError):
+        with state.request("a", CLEAR):
+            raise RuntimeError
+
+    assert state.mine() == ["a"]
+    state.clear_emoji("a")
+    assert state.emojis() == []
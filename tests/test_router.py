@@ -0,0 +1,115 @@
+import asyncio
+from types import SimpleNamespace
+
+from reactive_message.ReactiveMessageRouter import ReactiveMessageRouter
+
+
+class FakeMessage:
+    def __init__(self, channel_id, bound_id=None):
+        self.channel = SimpleNamespace(id=channel_id)
+        self.bound_message = SimpleNamespace(id=bound_id) if bound_id is not None else None
+        self.removed = False
+        self.thawed = False
+
+    async def remove(self):
+        self.removed = True
+
+    def thaw(self):
+        self.thawed = True
+
+
+def make_router():
+    scheduled = []
+    bot = SimpleNamespace(_schedule_event=lambda method, name, *args, **kwargs: scheduled.append((method, name)))
+    return ReactiveMessageRouter(bot), scheduled
+
+
+def test_channel_events_reach_the_messages_of_the_channel():
+    router, _ = make_router()
+    first, second, elsewhere = FakeMessage(1), FakeMessage(1), FakeMessage(2)
+    for message in (first, second, elsewhere):
+        router.add(message)
+
+    targets = router.targets("message", (SimpleNamespace(channel=SimpleNamespace(id=1)),))
+    assert set(targets) == {first, second}
+
+
+def test_message_events_reach_the_bound_message_only():
+    router, _ = make_router()
+    bound, other = FakeMessage(1, bound_id=10), FakeMessage(1, bound_id=11)
+    router.add(bound)
+    router.add(other)
+
+    assert router.targets("raw_reaction_add", (SimpleNamespace(message_id=10),)) == [bound]
+    assert router.targets("raw_bulk_message_delete", (SimpleNamespace(message_ids={11, 12}),)) == [other]
+    assert router.targets("raw_reaction_add", (SimpleNamespace(message_id=12),)) == []
+
+
+def test_removed_and_rebound_messages():
+    router, _ = make_router()
+    message = FakeMessage(1, bound_id=10)
+    router.add(message)
+
+    new = SimpleNamespace(id=20)
+    router.rebind(message, message.bound_message, new)
+    message.bound_message = new
+    assert router.targets("raw_reaction_add", (SimpleNamespace(message_id=10),)) == []
+    assert router.targets("raw_reaction_add", (SimpleNamespace(message_id=20),)) == [message]
+
+    router.remove(message)
+    assert router.targets("raw_reaction_add", (SimpleNamespace(message_id=20),)) == []
+    assert len(router) == 0
+
+
+def test_subscribed_events_go_through_on_event():
+    router, scheduled = make_router()
+    message = FakeMessage(1)
+    message.on_event = object()
+    router.add(message)
+    router.subscribe(message, ("member_update",))
+
+    router.dispatch("member_update", None, None)
+    assert scheduled == [(message.on_event, "on_event")]
+
+    router.subscribe(message, ())
+    router.dispatch("member_update", None, None)
+    assert len(scheduled) == 1
+
+
+def test_an_event_for_a_frozen_message_thaws_it():
+    router, _ = make_router()
+    message = FakeMessage(1, bound_id=10)
+    router.freeze(message)
+
+    router.dispatch("raw_reaction_add", SimpleNamespace(message_id=10))
+    assert message.thawed
+    assert router.frozen() == ()
+
+
+def test_frozen_cap_removes_the_oldest():
+    async def scenario():
+        router, _ = make_router()
+        router.FROZEN_CAP = 2
+        messages = [FakeMessage(1, bound_id=idx) for idx in range(3)]
+
+        for message in messages:
+            router.freeze(message)
+        await asyncio.sleep(0)
+
+        assert [message.removed for message in messages] == [True, False, False]
+        assert router.frozen() == tuple(messages[1:])
+
+    asyncio.new_event_loop().run_until_complete(scenario())
+
+
+def test_subscribed_or_unbound_messages_are_not_thawable():
+    router, _ = make_router()
+    bound, unbound = FakeMessage(1, bound_id=10), FakeMessage(1)
+    router.add(bound)
+    router.add(unbound)
+
+    assert router.thawable(bound)
+    assert not router.thawable(unbound)
+
+    router.subscribe(bound, ("raw_reaction_add",))
+    assert not router.thawable(bound)
@@ -0,0 +1,86 @@
+import pytest
+
+from reactive_message.RoutedReactiveMessage import Page, Route, RoutedReactiveMessage, compile_route, resolve_route
+
+
+class Base(Page):
+    def render_message(self):
+        return {}
+
+
+class Literal(Base):
+    pass
+
+
+class Wildcard(Base):
+    pass
+
+
+class Rest(Base):
+    pass
+
+
+def test_literal_takes_precedence_over_the_fallback():
+    root = compile_route(Route().add_route("a", Literal).add_fallback("n", Wildcard).base(Base))
+
+    assert resolve_route(root, "") == (Base, ())
+    assert resolve_route(root, "a") == (Literal, ())
+    assert resolve_route(root, "b") == (Wildcard, (("n", "b"),))
+    assert resolve_route(root, "a.b") is None
+
+
+def test_vararg_takes_the_rest_of_the_route():
+    root = compile_route(Route().add_route("a", Literal).add_vararg("rest", Rest))
+
+    assert resolve_route(root, "a") == (Literal, ())
+    assert resolve_route(root, "x.y.z") == (Rest, (("rest", "x.y.z"),))
+    # no base page
+    assert resolve_route(root, "") is None
+
+
+def test_nested_fallback():
+    root = compile_route(Route().add_fallback("n", Route().add_route("edit", Literal).base(Wildcard)))
+
+    assert resolve_route(root, "3") == (Wildcard, (("n", "3"),))
+    assert resolve_route(root, "3.edit") == (Literal, (("n", "3"),))
+    assert resolve_route(root, "3.other") is None
+
+
+@pytest.mark.parametrize("route", [
+    Route().add_route("a.b", Literal),
+    Route().add_route("", Literal),
+    Route().add_fallback("n", Literal).add_vararg("rest", Rest),
+    Route().add_route("a", object),
+    Route().add_route("a", Route()),
+])
+def test_invalid_routes_raise_at_class_definition(route):
+    with pytest.raises(RuntimeError):
+        class Invalid(RoutedReactiveMessage):
+            ROUTE = route
+
+
+def test_self_containing_route_raises():
+    route = Route().base(Base)
+    route.add_route("again", route)
+
+    with pytest.raises(RuntimeError):
+        compile_route(route)
+
+
+def test_the_route_cache_is_per_class():
+    class First(RoutedReactiveMessage):
+        ROUTE = Route().add_route("a", Literal)
+
+    class Second(RoutedReactiveMessage):
+        ROUTE = Route().add_route("a", Wildcard)
+
+    class Inherited(First):
+        pass
+
+    assert First._resolve_route("a") == (Literal, ())
+    assert Second._resolve_route("a") == (Wildcard, ())
+    assert First._resolve_route.cache_info().currsize == 1
+    assert Second._resolve_route.cache_info().currsize == 1
+
+    # a subclass that doesn't set its own route shares its parent's
+    assert Inherited._resolve_route is First._resolve_route
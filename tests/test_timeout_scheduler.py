@@ -0,0 +1,117 @@
+from games.TimeoutScheduler import TimeoutScheduler
+
+
+class FakeLoop:
+    def __init__(self):
+        self.now = 0.0
+        self.calls = []
+
+    def time(self):
+        return self.now
+
+    def call_at(self, when, callback):
+        handle = FakeHandle(when)
+        self.calls.append(handle)
+        return handle
+
+
+class FakeHandle:
+    def __init__(self, when):
+        self.when = when
+        self.cancelled = False
+
+    def cancel(self):
+        self.cancelled = True
+
+
+def make_scheduler():
+    loop = FakeLoop()
+    return TimeoutScheduler(loop), loop
+
+
+def test_timers_fire_in_deadline_order():
+    scheduler, loop = make_scheduler()
+    fired = []
+    scheduler.timer(lambda: fired.append("late")).arm(20)
+    scheduler.timer(lambda: fired.append("early")).arm(10)
+
+    scheduler.run_due(15)
+    assert fired == ["early"]
+
+    scheduler.run_due(25)
+    assert fired == ["early", "late"]
+    assert len(scheduler) == 0
+
+
+def test_only_the_earliest_deadline_is_registered():
+    scheduler, loop = make_scheduler()
+    scheduler.timer(lambda: None).arm(20)
+    scheduler.timer(lambda: None).arm(30)
+    assert len(loop.calls) == 1 and loop.calls[0].when == 20
+
+    scheduler.timer(lambda: None).arm(10)
+    assert loop.calls[0].cancelled
+    assert loop.calls[-1].when == 10
+
+
+def test_an_extended_timer_fires_at_its_new_deadline_only():
+    scheduler, loop = make_scheduler()
+    fired = []
+    scheduler.timer(lambda: None).arm(5)
+    timer = scheduler.timer(lambda: fired.append(loop.now))
+    timer.arm(10)
+    timer.extend(5)
+
+    # the entry of the old deadline isn't at the top, it stays in the heap, stale
+    assert len(scheduler._heap) == 3
+    assert len(scheduler) == 2
+
+    loop.now = 12
+    scheduler.run_due()
+    assert fired == []
+
+    loop.now = 15
+    scheduler.run_due()
+    assert fired == [15]
+    assert not timer.armed
+
+
+def test_a_cancelled_timer_never_fires_and_its_entry_is_dropped():
+    scheduler, loop = make_scheduler()
+    fired = []
+    timer = scheduler.timer(lambda: fired.append(True))
+    timer.arm(10)
+    timer.cancel()
+
+    assert len(scheduler) == 0
+    scheduler.run_due(20)
+    assert fired == []
+    assert scheduler._heap == []
+
+
+def test_extending_a_stopped_timer_keeps_it_stopped():
+    scheduler, loop = make_scheduler()
+    timer = scheduler.timer(lambda: None)
+    timer.extend(5)
+
+    assert not timer.armed
+    assert len(scheduler) == 0
+
+
+def test_a_timer_can_be_rearmed_from_its_callback():
+    scheduler, loop = make_scheduler()
+    fired = []
+
+    def callback():
+        fired.append(loop.now)
+        if len(fired) < 3:
+            timer.arm(10)
+
+    timer = scheduler.timer(callback)
+    timer.arm(10)
+
+    for now in (10, 20, 30, 40):
+        loop.now = now
+        scheduler.run_due()
+
+    assert fired == [10, 20, 30]
@@ -0,0 +1,44 @@
+from types import SimpleNamespace
+
+from games.game_modules.uno.deck import UnoDeck
+from games.game_modules.uno.registry import (CARD_KINDS, PLAYABLE, DISPLAY, CardInstance, Color, CardType,
+                                             ChangeColorOnPlaceCardType, AdversaryPayColorOnPlaceCardType)
+
+
+def test_tables_match_the_rules():
+    cards = [CardInstance.from_code(code) for code in range(len(CARD_KINDS))]
+
+    for pending in (0, 2):
+        game = SimpleNamespace(cards_to_take=pending)
+
+        for top in cards:
+            for candidate in cards:
+                assert PLAYABLE[pending > 0][top.code][candidate.code] == \
+                       top.cls.other_place_attempt(top, candidate, game), (top.cls, candidate.cls, pending)
+                assert top.other_place_attempt(candidate, game) == \
+                       top.cls.other_place_attempt(top, candidate, game)
+
+        for card in cards:
+            assert DISPLAY[card.code] == card.cls.get_user_friendly(card)
+
+
+def test_refill_keeps_the_top_and_clears_wild_colors():
+    deck = UnoDeck()
+    deck.draw_pile = [CardInstance(CardType, Color(1), 5)]
+
+    wild = CardInstance(ChangeColorOnPlaceCardType, Color(2), None)
+    draw_four = CardInstance(AdversaryPayColorOnPlaceCardType, Color(3), 4)
+    top = CardInstance(ChangeColorOnPlaceCardType, Color(4), None)
+    deck.discard_pile = [wild, CardInstance(CardType, Color(2), 7), draw_four, top]
+
+    deck.refill()
+
+    assert deck.discard_pile == [top]
+    assert top.color == Color(4)
+    assert wild.color is None and draw_four.color is None
+    assert draw_four.code == CardInstance(AdversaryPayColorOnPlaceCardType, None, 4).code
+
+    # the recycled cards go under what was left of the draw pile
+    assert len(deck.draw_pile) == 4
+    assert deck.draw_pile[-1].number == 5
+    assert deck.reshuffles == 1
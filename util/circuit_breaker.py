@@ -0,0 +1,85 @@
+import time
+from enum import Enum
+
+import aiohttp
+
+
+class BreakerState(Enum):
+    CLOSED = 0
+    OPEN = 1
+    HALF_OPEN = 2
+
+
+class CircuitOpen(aiohttp.ClientError):
+    """a ClientError, so it's handled like the network errors it stands for"""
+    pass
+
+
+class CircuitBreaker:
+    """
+    stops calling a provider after FAILURE_THRESHOLD failures in a row, so callers fail fast instead of waiting
+    once RESET_TIMEOUT seconds passed a single probe goes through, it closes the breaker or opens it again
+    """
+
+    FAILURE_THRESHOLD = 5
+    RESET_TIMEOUT = 30
+
+    def __init__(self, name):
+        self.name = name
+        self.state = BreakerState.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self._probing = False
+
+        self.times_opened = 0
+        self.rejected = 0
+
+    def _reset_in(self):
+        return self.opened_at + self.RESET_TIMEOUT - time.monotonic()
+
+    @property
+    def available(self):
+        """whether a call would be let through right now"""
+        if self.state == BreakerState.OPEN:
+            return self._reset_in() <= 0
+
+        return not (self.state == BreakerState.HALF_OPEN and self._probing)
+
+    def check(self):
+        """raises CircuitOpen unless the call can go through"""
+        if self.state == BreakerState.OPEN and self._reset_in() <= 0:
+            self.state = BreakerState.HALF_OPEN
+
+        if self.state == BreakerState.OPEN or (self.state == BreakerState.HALF_OPEN and self._probing):
+            self.rejected += 1
+            raise CircuitOpen(f"{self.name} is failing, calls are refused for {max(self._reset_in(), 0):.0f}s")
+
+        if self.state == BreakerState.HALF_OPEN:
+            self._probing = True
+
+    def success(self):
+        self.state = BreakerState.CLOSED
+        self.failures = 0
+        self._probing = False
+
+    def failure(self):
+        self.failures += 1
+        self._probing = False
+
+        if self.state == BreakerState.HALF_OPEN or self.failures >= self.FAILURE_THRESHOLD:
+            if self.state != BreakerState.OPEN:
+                self.times_opened += 1
+
+            self.state = BreakerState.OPEN
+            self.opened_at = time.monotonic()
+
+    def abandon(self):
+        """the call was cancelled, it says nothing about the provider"""
+        self._probing = False
+
+    def stats(self):
+        return dict(state=self.state.name.lower(),
+                    failures=self.failures,
+                    reset_in=max(self._reset_in(), 0) if self.state == BreakerState.OPEN else 0,
+                    times_opened=self.times_opened,
+                    rejected=self.rejected)
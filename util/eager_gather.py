@@ -0,0 +1,80 @@
+import asyncio
+from functools import partial
+
+
+class _Resumed:
+    """the rest of a coroutine that was started by hand, awaitable so a task can finish it"""
+
+    __slots__ = ("coroutine", "yielded")
+
+    def __init__(self, coroutine, yielded):
+        self.coroutine = coroutine
+        self.yielded = yielded
+
+    def __await__(self):
+        coroutine, yielded = self.coroutine, self.yielded
+
+        while True:
+            try:
+                value = yield yielded
+            except BaseException as e:
+                step, argument = coroutine.throw, e
+            else:
+                step, argument = coroutine.send, value
+
+            try:
+                yielded = step(argument)
+            except StopIteration as stop:
+                return stop.value
+
+
+def _cancelled_early(coroutine, task):
+    # a task cancelled before its first step never resumes the coroutine, it still gets to handle the cancellation
+    if not task.cancelled() or coroutine.cr_frame is None:
+        return
+
+    try:
+        coroutine.throw(asyncio.CancelledError())
+    except BaseException:
+        pass
+    else:
+        coroutine.close()
+
+
+async def eager_gather(*coroutines):
+    """
+    like asyncio.gather, but each coroutine runs right away until it first suspends
+    the ones that finish without suspending (a send that only goes to the outbox) don't cost a task
+    every coroutine is waited for before the first exception, if any, is raised
+    """
+    results = [None] * len(coroutines)
+    pending = []
+    error = None
+
+    for idx, coroutine in enumerate(coroutines):
+        try:
+            yielded = coroutine.send(None)
+        except StopIteration as stop:
+            results[idx] = stop.value
+        except Exception as e:
+            if error is None:
+                error = e
+        else:
+            task = asyncio.ensure_future(_Resumed(coroutine, yielded))
+            task.add_done_callback(partial(_cancelled_early, coroutine))
+            pending.append((idx, task))
+
+    if len(pending) > 0:
+        outcomes = await asyncio.gather(*(task for _, task in pending), return_exceptions=True)
+
+        for (idx, _), outcome in zip(pending, outcomes):
+            if isinstance(outcome, BaseException):
+                if error is None:
+                    error = outcome
+            else:
+                results[idx] = outcome
+
+    if error is not None:
+        raise error
+
+    return results
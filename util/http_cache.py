@@ -0,0 +1,233 @@
+import asyncio
+import hashlib
+import json
+import os
+import time
+from collections import OrderedDict, Counter
+from typing import Dict, NamedTuple, Optional
+
+
+class CachePolicy(NamedTuple):
+    ttl: float  # seconds a response is served without asking the server
+    stale: float  # seconds after that it's still served while being revalidated in the background
+
+
+# hosts whose responses are cached, subdomains included, the others always go to the network
+# opentdb isn't one: its session tokens are per game and each question batch has to be new
+POLICIES = {
+    "flagcdn.com": CachePolicy(ttl=7 * 24 * 3600, stale=30 * 24 * 3600),
+    "lgbta.wikia.org": CachePolicy(ttl=24 * 3600, stale=7 * 24 * 3600),
+    "nocookie.net": CachePolicy(ttl=30 * 24 * 3600, stale=90 * 24 * 3600),  # the wiki's images
+    "pronouns.page": CachePolicy(ttl=24 * 3600, stale=7 * 24 * 3600),
+}
+
+
+class CacheEntry:
+    __slots__ = ("digest", "size", "status", "content_type", "etag", "last_modified", "stored_at")
+
+    def __init__(self, digest, size, status, content_type, etag, last_modified, stored_at):
+        self.digest = digest
+        self.size = size
+        self.status = status
+        self.content_type = content_type
+        self.etag = etag
+        self.last_modified = last_modified
+        self.stored_at = stored_at
+
+    def to_dict(self):
+        return {key: getattr(self, key) for key in self.__slots__}
+
+    def conditional_headers(self):
+        headers = {}
+        if self.etag is not None:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified is not None:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+class HttpCache:
+    """
+    responses of the hosts in POLICIES kept on disk across restarts
+    bodies are stored once per content hash, the index maps urls to them and evicts the least recently used
+    """
+
+    # total size of the stored bodies
+    MAX_SIZE = 256 << 20
+
+    # seconds changes to the index are gathered before it's written
+    SAVE_DELAY = 5
+
+    def __init__(self, directory, max_size=MAX_SIZE):
+        self.directory = directory
+        self.max_size = max_size
+
+        self._entries: OrderedDict = OrderedDict()  # url -> entry, least recently used first
+        self._references: Counter = Counter()  # digest -> urls using it
+        self._sizes: Dict[str, int] = {}
+        self.size = 0
+        self._save_handle: Optional[asyncio.TimerHandle] = None
+
+        self.hits = 0
+        self.stale_hits = 0
+        self.revalidated = 0
+        self.misses = 0
+
+    @property
+    def _index_path(self):
+        return os.path.join(self.directory, "index.json")
+
+    def _object_path(self, digest):
+        return os.path.join(self.directory, "objects", digest[:2], digest)
+
+    @staticmethod
+    def policy(host) -> Optional[CachePolicy]:
+        if host is None:
+            return None
+
+        for domain, policy in POLICIES.items():
+            if host == domain or host.endswith(f".{domain}"):
+                return policy
+
+        return None
+
+    def load(self):
+        try:
+            with open(self._index_path) as f:
+                index = json.load(f)
+        except (FileNotFoundError, ValueError):
+            index = []
+
+        for url, data in index:
+            entry = CacheEntry(**data)
+
+            if os.path.exists(self._object_path(entry.digest)):
+                self._add(url, entry)
+
+    def _add(self, url, entry):
+        self._entries[url] = entry
+        self._entries.move_to_end(url)
+        self._references[entry.digest] += 1
+
+        if entry.digest not in self._sizes:
+            self._sizes[entry.digest] = entry.size
+            self.size += entry.size
+
+    def _remove(self, url):
+        self._release(self._entries.pop(url).digest)
+
+    def _release(self, digest):
+        self._references[digest] -= 1
+
+        if self._references[digest] <= 0:
+            del self._references[digest]
+            self.size -= self._sizes.pop(digest)
+
+            try:
+                os.remove(self._object_path(digest))
+            except FileNotFoundError:
+                pass
+
+    def get(self, url) -> Optional[CacheEntry]:
+        entry = self._entries.get(url)
+
+        if entry is not None:
+            self._entries.move_to_end(url)
+
+        return entry
+
+    def age(self, entry: CacheEntry):
+        return time.time() - entry.stored_at
+
+    async def read(self, entry: CacheEntry) -> Optional[bytes]:
+        """the stored body, None if it was removed from the disk in the meantime"""
+        try:
+            return await asyncio.get_running_loop().run_in_executor(None, self._read, entry.digest)
+        except FileNotFoundError:
+            return None
+
+    def _read(self, digest):
+        with open(self._object_path(digest), "rb") as f:
+            return f.read()
+
+    def _write(self, digest, body):
+        path = self._object_path(digest)
+        if os.path.exists(path):
+            return
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        temporary = f"{path}.tmp"
+        with open(temporary, "wb") as f:
+            f.write(body)
+        os.replace(temporary, path)
+
+    async def store(self, url, response):
+        if len(response.body) > self.max_size:
+            return
+
+        digest = hashlib.sha256(response.body).hexdigest()
+        await asyncio.get_running_loop().run_in_executor(None, self._write, digest, response.body)
+
+        entry = CacheEntry(digest, len(response.body), response.status, response.headers.get("Content-Type"),
+                           response.headers.get("ETag"), response.headers.get("Last-Modified"), time.time())
+
+        previous = self._entries.get(url)
+
+        if previous is not None and previous.digest == digest:
+            # same body, only the metadata changes, the object is kept
+            self._entries[url] = entry
+            self._entries.move_to_end(url)
+        else:
+            # the new digest is referenced before the old one is released, in case they share the object
+            self._add(url, entry)
+
+            if previous is not None:
+                self._release(previous.digest)
+
+        while self.size > self.max_size:
+            self._remove(next(iter(self._entries)))
+
+        self._schedule_save()
+
+    def refresh(self, entry: CacheEntry):
+        """the server said the stored body is still current"""
+        entry.stored_at = time.time()
+        self.revalidated += 1
+        self._schedule_save()
+
+    def _schedule_save(self):
+        if self._save_handle is None:
+            self._save_handle = asyncio.get_running_loop().call_later(self.SAVE_DELAY, self._save_later)
+
+    def _save_later(self):
+        self._save_handle = None
+        asyncio.get_running_loop().run_in_executor(None, self._save, self._dump())
+
+    def _dump(self):
+        return json.dumps([(url, entry.to_dict()) for url, entry in self._entries.items()])
+
+    def _save(self, data):
+        os.makedirs(self.directory, exist_ok=True)
+
+        temporary = f"{self._index_path}.tmp"
+        with open(temporary, "w") as f:
+            f.write(data)
+        os.replace(temporary, self._index_path)
+
+    def close(self):
+        if self._save_handle is not None:
+            self._save_handle.cancel()
+            self._save_handle = None
+            self._save(self._dump())
+
+    def stats(self):
+        return dict(entries=len(self._entries),
+                    size=self.size,
+                    hits=self.hits,
+                    stale_hits=self.stale_hits,
+                    revalidated=self.revalidated,
+                    misses=self.misses)
+
+    def __len__(self):
+        return len(self._entries)
@@ -0,0 +1,280 @@
+import asyncio
+import bisect
+import json
+import random
+import time
+from collections import defaultdict
+from typing import Dict, Optional
+from urllib.parse import urlsplit
+
+import aiohttp
+
+from util.circuit_breaker import CircuitBreaker
+from util.http_cache import HttpCache
+
+# upper bounds of the latency buckets, in seconds, the last bucket holds everything slower
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+
+class ResponseTooLarge(aiohttp.ClientError):
+    pass
+
+
+class Response:
+    """a response read in full, so the connection goes back to the pool right away"""
+
+    __slots__ = ("url", "status", "headers", "body")
+
+    def __init__(self, url, status, headers, body: bytes):
+        self.url = url
+        self.status = status
+        self.headers = headers
+        self.body = body
+
+    def text(self, encoding="utf-8"):
+        return self.body.decode(encoding)
+
+    def json(self):
+        return json.loads(self.body)
+
+
+class HostMetrics:
+    def __init__(self):
+        self.requests = 0
+        self.errors = 0
+        self.total_time = 0.0
+        self.buckets = [0] * (len(LATENCY_BUCKETS) + 1)
+
+    def observe(self, seconds, failed):
+        self.requests += 1
+        self.errors += failed
+        self.total_time += seconds
+        self.buckets[bisect.bisect_left(LATENCY_BUCKETS, seconds)] += 1
+
+    def stats(self):
+        labels = [f"<={bound}s" for bound in LATENCY_BUCKETS] + [f">{LATENCY_BUCKETS[-1]}s"]
+
+        return dict(requests=self.requests,
+                    errors=self.errors,
+                    mean=self.total_time / self.requests if self.requests > 0 else 0,
+                    histogram=dict(zip(labels, self.buckets)))
+
+
+class HttpClient:
+    """
+    the one session every outbound request goes through: pooled keep-alive connections, cached dns,
+    default timeouts, a cap on concurrent requests per host and on the size of the responses,
+    retries and a circuit breaker per host so a provider that's down fails fast
+    gets of the hosts with a cache policy are answered from the disk cache when it's set
+    """
+
+    # per attempt, a request is retried at most RETRIES times
+    TIMEOUT = aiohttp.ClientTimeout(total=10, connect=3)
+    RETRIES = 2
+    BACKOFF = 0.5  # seconds before the first retry, doubled for each one after
+
+    # bodies bigger than this are refused, images included
+    MAX_SIZE = 8 << 20
+
+    DEFAULT_HOST_LIMIT = 8
+    HOST_LIMITS = {
+        # the trivia api allows one request every few seconds per address
+        "opentdb.com": 1,
+    }
+
+    def __init__(self, cache: Optional[HttpCache] = None):
+        self.cache = cache
+        self._revalidating: Dict[str, asyncio.Task] = {}  # urls served stale and being fetched again
+
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._host_limits: Dict[str, asyncio.Semaphore] = {}
+        self.metrics: Dict[str, HostMetrics] = defaultdict(HostMetrics)
+        self.breakers: Dict[str, CircuitBreaker] = {}
+
+    def _get_session(self):
+        # created on first use, it needs the running loop
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(limit=100, ttl_dns_cache=300)
+            self._session = aiohttp.ClientSession(connector=connector, timeout=self.TIMEOUT)
+
+        return self._session
+
+    def _host_limit(self, host):
+        semaphore = self._host_limits.get(host)
+
+        if semaphore is None:
+            limit = self.HOST_LIMITS.get(host, self.DEFAULT_HOST_LIMIT)
+            semaphore = self._host_limits[host] = asyncio.Semaphore(limit)
+
+        return semaphore
+
+    def breaker(self, host) -> CircuitBreaker:
+        breaker = self.breakers.get(host)
+
+        if breaker is None:
+            breaker = self.breakers[host] = CircuitBreaker(host)
+
+        return breaker
+
+    def available(self, host):
+        """false while the breaker of the host refuses calls"""
+        return self.breaker(host).available
+
+    async def request(self, method, url, *, retries=None, **kwargs) -> Response:
+        """
+        gets are retried RETRIES times by default, with jittered backoff, on network errors and 5xx
+        raises CircuitOpen right away while the host's breaker is open
+        """
+        breaker = self.breaker(urlsplit(url).hostname)
+
+        if retries is None:
+            retries = self.RETRIES if method == "GET" else 0
+
+        for attempt in range(retries + 1):
+            breaker.check()
+
+            try:
+                response = await self._send(method, url, **kwargs)
+            except ResponseTooLarge:
+                # the host answered, the response just isn't wanted
+                breaker.success()
+                raise
+            except (aiohttp.ClientError, asyncio.TimeoutError):
+                breaker.failure()
+
+                if attempt == retries:
+                    raise
+            except BaseException:
+                breaker.abandon()
+                raise
+            else:
+                if response.status < 500 and response.status != 429:
+                    breaker.success()
+                    return response
+
+                breaker.failure()
+
+                if attempt == retries:
+                    return response
+
+            await asyncio.sleep(self.BACKOFF * 2 ** attempt * random.uniform(0.5, 1.5))
+
+    async def _send(self, method, url, *, max_size=None, **kwargs) -> Response:
+        max_size = self.MAX_SIZE if max_size is None else max_size
+        host = urlsplit(url).hostname
+
+        async with self._host_limit(host):
+            start = time.perf_counter()
+            failed = True
+
+            try:
+                async with self._get_session().request(method, url, **kwargs) as response:
+                    if response.content_length is not None and response.content_length > max_size:
+                        raise ResponseTooLarge(f"{url} is {response.content_length} bytes")
+
+                    body = bytearray()
+                    async for chunk in response.content.iter_chunked(1 << 16):
+                        body.extend(chunk)
+
+                        if len(body) > max_size:
+                            raise ResponseTooLarge(f"{url} is over {max_size} bytes")
+
+                    failed = response.status >= 500
+                    return Response(url, response.status, response.headers, bytes(body))
+            finally:
+                self.metrics[host].observe(time.perf_counter() - start, failed)
+
+    async def get(self, url, **kwargs) -> Response:
+        """served from the cache when the host has a policy in it"""
+        policy = self.cache.policy(urlsplit(url).hostname) if self.cache is not None else None
+
+        if policy is None:
+            return await self.request("GET", url, **kwargs)
+
+        entry = self.cache.get(url)
+
+        if entry is not None:
+            age = self.cache.age(entry)
+
+            if age < policy.ttl + policy.stale:
+                cached = await self._from_cache(url, entry)
+
+                if cached is not None:
+                    if age < policy.ttl:
+                        self.cache.hits += 1
+                    else:
+                        self.cache.stale_hits += 1
+                        self._revalidate_later(url, entry, kwargs)
+
+                    return cached
+
+        self.cache.misses += 1
+        return await self._revalidate(url, entry, **kwargs)
+
+    async def _from_cache(self, url, entry) -> Optional[Response]:
+        body = await self.cache.read(entry)
+
+        if body is None:
+            return None
+
+        return Response(url, entry.status, {"Content-Type": entry.content_type}, body)
+
+    async def _revalidate(self, url, entry, headers=None, **kwargs) -> Response:
+        conditional = dict(headers or {})
+        if entry is not None:
+            conditional.update(entry.conditional_headers())
+
+        try:
+            response = await self.request("GET", url, headers=conditional, **kwargs)
+        except (aiohttp.ClientError, asyncio.TimeoutError):
+            cached = await self._from_cache(url, entry) if entry is not None else None
+            if cached is None:
+                raise
+
+            # better stale than nothing
+            return cached
+
+        if response.status == 304 and entry is not None:
+            cached = await self._from_cache(url, entry)
+
+            if cached is not None:
+                self.cache.refresh(entry)
+                return cached
+
+            # the body is gone, asked again without conditions
+            return await self._revalidate(url, None, headers, **kwargs)
+
+        if response.status == 200 and "no-store" not in response.headers.get("Cache-Control", ""):
+            await self.cache.store(url, response)
+
+        return response
+
+    def _revalidate_later(self, url, entry, kwargs):
+        if url in self._revalidating:
+            return
+
+        async def revalidate():
+            try:
+                await self._revalidate(url, entry, **kwargs)
+            except (aiohttp.ClientError, asyncio.TimeoutError):
+                pass
+            finally:
+                del self._revalidating[url]
+
+        self._revalidating[url] = asyncio.ensure_future(revalidate())
+
+    def stats(self):
+        return {host: dict(metrics.stats(), breaker=self.breaker(host).stats())
+                for host, metrics in self.metrics.items()}
+
+    async def close(self):
+        if self.cache is not None:
+            self.cache.close()
+
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+
+# shared by everything, the bot closes it when it shuts down
+client = HttpClient()
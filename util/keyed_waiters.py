@@ -0,0 +1,93 @@
+import asyncio
+from collections import defaultdict
+from typing import Dict, List, Tuple, Callable, Optional, Any
+
+# how each event is turned into the key waiters are registered under
+KEY_EXTRACTORS: Dict[str, Callable[..., Any]] = {
+    "raw_reaction_add": lambda ev: ev.message_id,
+    "raw_reaction_remove": lambda ev: ev.message_id,
+    "message": lambda message: (message.channel.id, message.author.id),
+    "guild_channel_update": lambda before, after: after.id,
+    "guild_role_update": lambda before, after: after.guild.id,
+    "member_update": lambda before, after: (after.guild.id, after.id),
+}
+
+
+def _result_from_args(args):
+    # mirrors what discord.py's wait_for returns
+    if len(args) == 0:
+        return None
+    elif len(args) == 1:
+        return args[0]
+    else:
+        return args
+
+
+class KeyedWaiters:
+    """resolves wait_for futures by looking the event key up instead of evaluating every check"""
+
+    def __init__(self, loop=None):
+        self.loop = loop
+        self._waiters: Dict[str, Dict[Any, List[Tuple[asyncio.Future, Optional[Callable]]]]] = defaultdict(dict)
+
+    def wait(self, event, key, check=None, timeout=None):
+        if event not in KEY_EXTRACTORS:
+            raise ValueError(f"event {event} cannot be waited by key")
+
+        loop = self.loop or asyncio.get_event_loop()
+        future = loop.create_future()
+        entry = (future, check)
+
+        self._waiters[event].setdefault(key, []).append(entry)
+        future.add_done_callback(lambda _: self._discard(event, key, entry))
+
+        return asyncio.wait_for(future, timeout)
+
+    def _discard(self, event, key, entry):
+        by_key = self._waiters.get(event)
+        if by_key is None:
+            return
+
+        entries = by_key.get(key)
+        if entries is None:
+            return
+
+        try:
+            entries.remove(entry)
+        except ValueError:
+            pass
+
+        if len(entries) == 0:
+            del by_key[key]
+            if len(by_key) == 0:
+                del self._waiters[event]
+
+    def dispatch(self, event, *args):
+        by_key = self._waiters.get(event)
+        if by_key is None:
+            return
+
+        try:
+            key = KEY_EXTRACTORS[event](*args)
+        except AttributeError:
+            # some payloads lack the attributes the key is made of (dm channels without guilds)
+            return
+
+        entries = by_key.get(key)
+        if entries is None:
+            return
+
+        for future, check in tuple(entries):
+            if future.done():
+                continue
+
+            try:
+                result = check is None or check(*args)
+            except Exception as exc:
+                future.set_exception(exc)
+            else:
+                if result:
+                    future.set_result(_result_from_args(args))
+
+    def __len__(self):
+        return sum(len(entries) for by_key in self._waiters.values() for entries in by_key.values())